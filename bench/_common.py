@@ -0,0 +1,82 @@
+#
+# Helpers shared by the benchmarks in this directory.
+#
+# Every benchmark takes one or more copies of dropbox.py as SCRIPT
+# arguments and times each of them the same way, so two revisions can be
+# compared side by side:
+#
+#   git show HEAD~1:resources/dropbox.py > /tmp/dropbox-old.py
+#   python2 bench/startup.py /tmp/dropbox-old.py resources/dropbox.py
+#
+# Since dropbox.py became a stub for dropbox_cli.py, check both files of
+# a revision out into one directory and pass its dropbox.py:
+#
+#   mkdir /tmp/old
+#   git show REV:resources/dropbox.py > /tmp/old/dropbox.py
+#   git show REV:resources/dropbox_cli.py > /tmp/old/dropbox_cli.py
+#
+from __future__ import print_function
+
+import imp
+import optparse
+import os
+import subprocess
+import time
+
+DROPBOX_PY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "resources", "dropbox.py")
+
+def option_parser(usage, runs, python=False):
+    """An OptionParser with -n/--runs, and -p/--python for benchmarks
+    that run the scripts in a fresh interpreter."""
+    oparser = optparse.OptionParser(usage=usage)
+    oparser.add_option("-n", "--runs", type="int", dest="runs", default=runs)
+    if python:
+        oparser.add_option("-p", "--python", dest="python", default="python2",
+                           help="interpreter to run the scripts with (default python2)")
+    return oparser
+
+def parse_scripts(oparser, argv):
+    """Returns (options, scripts), or None after printing help when no
+    script or no run was asked for."""
+    (options, scripts) = oparser.parse_args(argv)
+    if not scripts or options.runs < 1:
+        oparser.print_help()
+        return None
+    return options, scripts
+
+def load_script(path):
+    """Imports a copy of dropbox.py under a name of its own, so several
+    revisions can be loaded side by side. Where dropbox.py is only the
+    stub for dropbox_cli.py, the dropbox_cli.py next to it is loaded."""
+    cli = os.path.join(os.path.dirname(os.path.abspath(path)), "dropbox_cli.py")
+    with open(path) as f:
+        if "import dropbox_cli" in f.read() and os.path.exists(cli):
+            path = cli
+    return imp.load_source("dropbox_bench_%d" % abs(hash(os.path.abspath(path))), path)
+
+def run_script(python, script, argv, runs, **kwargs):
+    """Runs `script` with `argv` in a fresh interpreter `runs` times and
+    returns the sorted wall times. Output is discarded."""
+    devnull = open(os.devnull, "w")
+    timings = []
+    try:
+        for i in range(runs):
+            start = time.time()
+            subprocess.call([python, script] + argv, stdout=devnull, stderr=devnull, **kwargs)
+            timings.append(time.time() - start)
+    finally:
+        devnull.close()
+    timings.sort()
+    return timings
+
+def percentile(timings, fraction):
+    """Nearest rank percentile of sorted `timings`."""
+    index = max(0, int(round(fraction * len(timings) + 0.5)) - 1)
+    return timings[min(index, len(timings) - 1)]
+
+def median(timings):
+    return percentile(timings, 0.5)
+
+def width(scripts):
+    """Column width that lines the script names up in reports."""
+    return max(len(s) for s in scripts)
@@ -0,0 +1,62 @@
+#!/usr/bin/python
+#
+# Layout benchmark for columnize(), the "filestatus -l" table.
+#
+# Lays out synthetic colored listings of each --files size at a fixed
+# terminal width, with names all the same length and of mixed lengths,
+# with each SCRIPT (see bench/_common.py).
+#
+from __future__ import print_function
+
+import random
+import sys
+import time
+
+import _common
+
+DEFAULT_FILES = [1000, 10000]
+
+def listings(size):
+    same = [u"file-%06d" % i for i in range(size)]
+    rng = random.Random(size)
+    mixed = [u"%s-%d" % (u"n" * rng.randint(1, 40), i) for i in range(size)]
+    for name, names in (("same length", same), ("mixed length", mixed)):
+        colored = [u"\x1b[32;1m" + n + u"\x1b[0m" for n in names]
+        yield "%d files, %s" % (size, name), names, colored
+
+def time_columnize(module, names, colored, width, runs):
+    lines = []
+    module.console_print = lambda s=u"": lines.append(s)
+    timings = []
+    for i in range(runs):
+        del lines[:]
+        start = time.time()
+        module.columnize(names, colored, width)
+        timings.append(time.time() - start)
+    timings.sort()
+    return _common.median(timings), len(lines)
+
+def main(argv):
+    oparser = _common.option_parser("%prog [-n RUNS] [-f FILES]... [-w COLUMNS] SCRIPT...", 3)
+    oparser.add_option("-f", "--files", type="int", action="append", dest="sizes",
+                       help="names in a listing, can be repeated (default 1000 and 10000)")
+    oparser.add_option("-w", "--width", type="int", dest="width", default=120,
+                       help="terminal columns to lay out for (default 120)")
+    parsed = _common.parse_scripts(oparser, argv)
+    if parsed is None:
+        return 2
+    options, scripts = parsed
+
+    modules = [(script, _common.load_script(script)) for script in scripts]
+    width = _common.width(scripts)
+    print("%d runs each, %d columns" % (options.runs, options.width))
+    for size in options.sizes or DEFAULT_FILES:
+        for name, names, colored in listings(size):
+            print(name)
+            for script, module in modules:
+                median, rows = time_columnize(module, names, colored, options.width, options.runs)
+                print("  %-*s  median %8.1fms  %6d rows" % (width, script, median * 1000, rows))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
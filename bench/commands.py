@@ -0,0 +1,133 @@
+#!/usr/bin/python
+#
+# End to end benchmark for dropbox.py commands against the stand-in
+# daemon (bench/dropboxd_standin.py), so no Dropbox account is needed.
+#
+# Sets up a throwaway HOME with synthetic directories of each --files
+# size, then runs every command RUNS times per SCRIPT (see
+# bench/_common.py) in a fresh interpreter and prints p50/p99 wall time
+# and the daemon requests served per second.
+#
+# The status cache is disabled (DROPBOX_CACHE_TTL=0) unless --cache is
+# given, so every run talks to the stand-in.
+#
+from __future__ import print_function
+
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import _common
+
+STANDIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dropboxd_standin.py")
+DEFAULT_FILES = [1000, 10000]
+
+def make_home(sizes):
+    home = tempfile.mkdtemp(prefix="dropbox-bench.")
+    dist = os.path.join(home, ".dropbox-dist")
+    os.makedirs(dist)
+    # dropbox.py only checks that the daemon is installed, never runs it
+    dropboxd = os.path.join(dist, "dropboxd")
+    with open(dropboxd, "w") as f:
+        f.write("#!/bin/sh\n")
+    os.chmod(dropboxd, 0o755)
+
+    for size in sizes:
+        directory = os.path.join(home, "Dropbox", "files-%d" % size)
+        os.makedirs(directory)
+        for i in range(size):
+            open(os.path.join(directory, "file-%06d" % i), "w").close()
+    return home
+
+def standin_stats(home):
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    s.connect(os.path.join(home, ".dropbox", "command_socket"))
+    f = s.makefile("rwb", 4096)
+    try:
+        f.write(b"standin_stats\ndone\n")
+        f.flush()
+        stats = {}
+        assert f.readline() == b"ok\n"
+        while True:
+            line = f.readline().rstrip(b"\n").decode("utf8")
+            if line == "done":
+                return stats
+            key, value = line.split("\t")[:2]
+            stats[key] = int(value)
+    finally:
+        f.close()
+        s.close()
+
+def start_standin(python, home, options):
+    env = dict(os.environ, HOME=home)
+    args = [python, STANDIN, "--latency", str(options.latency),
+            "--root", os.path.join(home, "Dropbox")]
+    process = subprocess.Popen(args, env=env)
+    sock = os.path.join(home, ".dropbox", "command_socket")
+    for i in range(100):
+        if os.path.exists(sock):
+            return process
+        time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("the stand-in daemon didn't start")
+
+def run(python, script, home, cwd, argv, runs, env):
+    before = standin_stats(home)["requests"]
+    timings = _common.run_script(python, script, argv, runs, cwd=cwd, env=env)
+    return timings, standin_stats(home)["requests"] - before
+
+def scenarios(home, sizes):
+    root = os.path.join(home, "Dropbox")
+    yield "status", root, ["status"]
+    for size in sizes:
+        yield "filestatus -l (%d files)" % size, os.path.join(root, "files-%d" % size), ["filestatus", "-l"]
+    size = min(sizes)
+    directory = os.path.join(root, "files-%d" % size)
+    paths = [os.path.join(directory, name) for name in sorted(os.listdir(directory))]
+    yield "exclude add (%d paths)" % size, root, ["exclude", "add"] + paths
+    yield "exclude remove (%d paths)" % size, root, ["exclude", "remove"] + paths
+    yield "exclude list", root, ["exclude", "list"]
+
+def main(argv):
+    oparser = _common.option_parser("%prog [-n RUNS] [-f FILES]... [-l SECONDS] SCRIPT...", 10, python=True)
+    oparser.add_option("-f", "--files", type="int", action="append", dest="sizes",
+                       help="files in a synthetic directory, can be repeated (default 1000 and 10000)")
+    oparser.add_option("-l", "--latency", type="float", dest="latency", default=0,
+                       help="seconds the stand-in waits before each reply")
+    oparser.add_option("--cache", action="store_true", dest="cache",
+                       help="leave the status cache on")
+    parsed = _common.parse_scripts(oparser, argv)
+    if parsed is None:
+        return 2
+    options, scripts = parsed
+
+    sizes = options.sizes or DEFAULT_FILES
+    scripts = [os.path.abspath(script) for script in scripts]
+    home = make_home(sizes)
+    env = dict(os.environ, HOME=home)
+    if not options.cache:
+        env["DROPBOX_CACHE_TTL"] = "0"
+    standin = start_standin(options.python, home, options)
+    try:
+        width = _common.width(scripts)
+        print("%d runs each, stand-in latency %gms" % (options.runs, options.latency * 1000))
+        for name, cwd, command in scenarios(home, sizes):
+            print(name)
+            for script in scripts:
+                timings, requests = run(options.python, script, home, cwd, command, options.runs, env)
+                total = sum(timings)
+                print("  %-*s  p50 %8.1fms  p99 %8.1fms  %9.0f req/s" %
+                      (width, script, _common.median(timings) * 1000,
+                       _common.percentile(timings, 0.99) * 1000, requests / total if total else 0))
+    finally:
+        standin.terminate()
+        standin.wait()
+        shutil.rmtree(home)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
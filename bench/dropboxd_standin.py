@@ -0,0 +1,175 @@
+#!/usr/bin/python
+#
+# Stand-in for the Dropbox daemon's command socket.
+#
+# Speaks the same line protocol as dropboxd on ~/.dropbox/command_socket
+# and writes ~/.dropbox/dropbox.pid, so dropbox.py can be run and
+# benchmarked without a Dropbox account:
+#
+#   python2 bench/dropboxd_standin.py --latency 0.001 --ignore-set 5000 &
+#   python2 resources/dropbox.py status
+#
+# Answers get_dropbox_status, icon_overlay_file_status, get_ignore_set,
+# ignore_set_add, ignore_set_remove and get_public_link; anything else
+# is refused like the real daemon refuses unknown commands. The
+# non-standard "standin_stats" command reports connections and requests
+# served so far.
+#
+from __future__ import print_function
+
+import optparse
+import os
+import random
+import socket
+import sys
+import threading
+import time
+
+class StandIn(object):
+    def __init__(self, options):
+        self.options = options
+        self.ignore_set = set(os.path.join(options.root, "excluded-%d" % i)
+                              for i in range(options.ignore_set))
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+
+    def status(self, path):
+        every = self.options.syncing_every
+        if every and hash(path) % every == 0:
+            return "syncing"
+        return "up to date"
+
+    def answer(self, name, args):
+        """Returns (ok, lines) for one request."""
+        if name == "get_dropbox_status":
+            status = self.options.status
+            return True, [["status"] + [status] * self.options.status_lines]
+        elif name == "icon_overlay_file_status":
+            return True, [["status", self.status(args.get("path", [""])[0])]]
+        elif name == "get_ignore_set":
+            with self.lock:
+                return True, [["ignore_set"] + sorted(self.ignore_set)]
+        elif name == "ignore_set_add":
+            paths = args.get("paths", [])
+            with self.lock:
+                self.ignore_set.update(paths)
+            return True, [["ignored"] + paths]
+        elif name == "ignore_set_remove":
+            paths = args.get("paths", [])
+            with self.lock:
+                self.ignore_set.difference_update(paths)
+            return True, [["removed"] + paths]
+        elif name == "get_public_link":
+            return True, [["link", "https://db.tt/standin"]]
+        elif name == "standin_stats":
+            with self.lock:
+                return True, [["connections", str(self.connections)],
+                              ["requests", str(self.requests)]]
+        return False, [["No command exists by that name"]]
+
+    def delay(self):
+        latency = self.options.latency
+        if self.options.jitter:
+            latency += random.uniform(0, self.options.jitter)
+        if latency > 0:
+            time.sleep(latency)
+
+    def handle(self, conn):
+        with self.lock:
+            self.connections += 1
+        f = conn.makefile("rwb", 65536)
+        padding = ["padding", "x" * self.options.padding] if self.options.padding else None
+        try:
+            while True:
+                name = f.readline()
+                if not name:
+                    return
+                args = {}
+                while True:
+                    line = f.readline()
+                    if not line:
+                        return
+                    line = line.rstrip(b"\n").decode("utf8")
+                    if line == "done":
+                        break
+                    fields = line.split("\t")
+                    args[fields[0]] = fields[1:]
+
+                with self.lock:
+                    self.requests += 1
+                self.delay()
+                ok, lines = self.answer(name.rstrip(b"\n").decode("utf8"), args)
+                if ok and padding:
+                    lines.append(padding)
+                reply = ["ok" if ok else "notok"] + ["\t".join(l) for l in lines] + ["done"]
+                f.write(("\n".join(reply) + "\n").encode("utf8"))
+                # a pipelining client may already have the next request queued
+                f.flush()
+        except socket.error:
+            pass
+        finally:
+            try:
+                f.close()
+            except socket.error:
+                pass
+            conn.close()
+
+    def serve(self, path):
+        if os.path.exists(path):
+            os.unlink(path)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(path)
+        listener.listen(128)
+        try:
+            while True:
+                conn, addr = listener.accept()
+                t = threading.Thread(target=self.handle, args=(conn,))
+                t.daemon = True
+                t.start()
+        finally:
+            listener.close()
+            os.unlink(path)
+
+def main(argv):
+    home = os.path.expanduser("~")
+    oparser = optparse.OptionParser(usage="%prog [OPTION]...")
+    oparser.add_option("--socket", dest="socket",
+                       default=os.path.join(home, ".dropbox", "command_socket"))
+    oparser.add_option("--pidfile", dest="pidfile",
+                       default=os.path.join(home, ".dropbox", "dropbox.pid"))
+    oparser.add_option("--latency", type="float", dest="latency", default=0,
+                       help="seconds to wait before each reply")
+    oparser.add_option("--jitter", type="float", dest="jitter", default=0,
+                       help="up to this many more seconds, at random")
+    oparser.add_option("--status", dest="status", default="Up to date")
+    oparser.add_option("--status-lines", type="int", dest="status_lines", default=1,
+                       help="lines in the get_dropbox_status reply")
+    oparser.add_option("--ignore-set", type="int", dest="ignore_set", default=0,
+                       help="synthetic paths the ignore set starts with")
+    oparser.add_option("--padding", type="int", dest="padding", default=0,
+                       help="bytes of filler added to every reply")
+    oparser.add_option("--syncing-every", type="int", dest="syncing_every", default=0,
+                       help="report about one file in this many as syncing")
+    oparser.add_option("--root", dest="root", default=os.path.join(home, "Dropbox"),
+                       help="directory the synthetic ignore set lives in")
+    (options, args) = oparser.parse_args(argv)
+
+    if args:
+        oparser.print_help()
+        return 2
+
+    for path in (options.socket, options.pidfile):
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+    with open(options.pidfile, "w") as f:
+        f.write("%d\n" % os.getpid())
+
+    try:
+        StandIn(options).serve(options.socket)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,68 @@
+#!/usr/bin/python
+#
+# Extraction benchmark for the daemon archive.
+#
+# Compares the old way of unpacking (tarfile in 'r:gz' mode, getmembers()
+# twice, extract() per member) with dropbox.py's extract_archive() on the
+# same archive, e.g. the real one:
+#
+#   wget -O /tmp/dropbox.tar.gz "https://www.dropbox.com/download?plat=lnx.x86_64"
+#   python2 bench/extract.py /tmp/dropbox.tar.gz
+#
+from __future__ import print_function
+
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+import time
+
+import _common
+
+def extract_members(path, dest):
+    # what DownloadState.unpack() used to do
+    with open(path, "rb") as f:
+        archive = tarfile.open(fileobj=f, mode='r:gz')
+        total_members = len(archive.getmembers())
+        for i, member in enumerate(archive.getmembers()):
+            archive.extract(member, dest)
+        archive.close()
+
+dropbox = _common.load_script(_common.DROPBOX_PY)
+
+def extract_streaming(path, dest):
+    with open(path, "rb") as f:
+        dropbox.extract_archive(f, dest)
+
+def run(func, path, runs):
+    timings = []
+    for i in range(runs):
+        dest = tempfile.mkdtemp(prefix="dropbox-bench.")
+        try:
+            start = time.time()
+            func(path, dest)
+            timings.append(time.time() - start)
+        finally:
+            shutil.rmtree(dest)
+    timings.sort()
+    return _common.median(timings), timings[0]
+
+def main(argv):
+    oparser = _common.option_parser("%prog [-n RUNS] ARCHIVE", 5)
+    (options, args) = oparser.parse_args(argv)
+
+    if len(args) != 1:
+        oparser.print_help()
+        return 2
+
+    size = os.path.getsize(args[0])
+    print("%s (%.1fMB, %d runs)" % (args[0], size / 1048576.0, options.runs))
+    for name, func in (("getmembers + extract", extract_members),
+                       ("extract_archive", extract_streaming)):
+        median, best = run(func, args[0], options.runs)
+        print("  %-22s median %7.1fms  best %7.1fms" % (name, median * 1000, best * 1000))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
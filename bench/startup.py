@@ -0,0 +1,34 @@
+#!/usr/bin/python
+#
+# Cold start benchmark for dropbox.py.
+#
+# Runs each command in a fresh interpreter RUNS times and prints the
+# median and best wall time of each SCRIPT (see bench/_common.py).
+#
+from __future__ import print_function
+
+import sys
+
+import _common
+
+DEFAULT_COMMANDS = ["running", "installed"]
+
+def main(argv):
+    oparser = _common.option_parser("%prog [-n RUNS] [-c COMMAND]... SCRIPT...", 30, python=True)
+    oparser.add_option("-c", "--command", action="append", dest="commands")
+    parsed = _common.parse_scripts(oparser, argv)
+    if parsed is None:
+        return 2
+    options, scripts = parsed
+
+    width = _common.width(scripts)
+    for command in options.commands or DEFAULT_COMMANDS:
+        print("%s (%d runs)" % (command, options.runs))
+        for script in scripts:
+            timings = _common.run_script(options.python, script, command.split(), options.runs)
+            print("  %-*s  median %6.1fms  best %6.1fms" %
+                  (width, script, _common.median(timings) * 1000, timings[0] * 1000))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,109 @@
+#!/usr/bin/python
+#
+# Per-request overhead benchmark for DropboxCommand.send_command.
+#
+# Answers every request from a trivial in-process daemon so what is left
+# is the client's own cost, mostly the CommandTicker, for each SCRIPT
+# (see bench/_common.py). --tty points stderr at a pseudo terminal, as
+# in an interactive shell.
+#
+from __future__ import print_function
+
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+import _common
+
+REPLY = b"ok\nstatus\tUp to date\ndone\n"
+
+def serve(listener, answering):
+    while True:
+        try:
+            conn, addr = listener.accept()
+        except socket.error:
+            # the listener was shut down
+            return
+        t = threading.Thread(target=answer, args=(conn,))
+        t.start()
+        answering.append(t)
+
+def answer(conn):
+    f = conn.makefile("r+", 4096)
+    try:
+        for line in f:
+            if line == b"done\n":
+                f.write(REPLY)
+                f.flush()
+    except socket.error:
+        pass
+    finally:
+        f.close()
+        conn.close()
+
+def time_requests(script, sock_path, requests, runs):
+    module = _common.load_script(script)
+    module.COMMAND_SOCKET = sock_path
+    dc = module.DropboxCommand()
+    timings = []
+    try:
+        for i in range(runs):
+            start = time.time()
+            for j in range(requests):
+                dc.send_command(u"get_dropbox_status", {})
+            timings.append((time.time() - start) / requests)
+    finally:
+        dc.close()
+    timings.sort()
+    return _common.median(timings), timings[0]
+
+def main(argv):
+    oparser = _common.option_parser("%prog [-n RUNS] [-r REQUESTS] [--tty] SCRIPT...", 5)
+    oparser.add_option("-r", "--requests", type="int", dest="requests", default=2000)
+    oparser.add_option("--tty", action="store_true", dest="tty")
+    parsed = _common.parse_scripts(oparser, argv)
+    if parsed is None:
+        return 2
+    options, scripts = parsed
+
+    tmp = tempfile.mkdtemp(prefix="dropbox-bench.")
+    sock_path = os.path.join(tmp, "command_socket")
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(sock_path)
+    listener.listen(8)
+    answering = []
+    t = threading.Thread(target=serve, args=(listener, answering))
+    t.start()
+
+    stderr = sys.stderr
+    if options.tty:
+        master, slave = os.openpty()
+        sys.stderr = os.fdopen(slave, "w")
+
+    try:
+        results = [(script, time_requests(script, sock_path, options.requests, options.runs))
+                   for script in scripts]
+    finally:
+        sys.stderr = stderr
+        # every client connection is closed by now, so the answering
+        # threads end on EOF; stop accepting and wait for all of them
+        listener.shutdown(socket.SHUT_RDWR)
+        t.join()
+        for answerer in answering:
+            answerer.join()
+        listener.close()
+        shutil.rmtree(tmp)
+
+    width = _common.width(scripts)
+    print("send_command, %d requests x %d runs%s" %
+          (options.requests, options.runs, ", stderr is a tty" if options.tty else ""))
+    for script, (median, best) in results:
+        print("  %-*s  median %6.1fus  best %6.1fus" % (width, script, median * 1e6, best * 1e6))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,67 @@
+#!/usr/bin/python
+#
+# dropbox-shim
+# Forwards dropbox.py commands to a resident "dropbox.py serve" helper so
+# they skip the script's startup and daemon connection setup. Falls back
+# to running dropbox.py itself when no helper is listening or when the
+# helper won't run the command. The DROPBOX_* environment variables are
+# sent along, the helper runs the command with them.
+#
+# Usage is the same as dropbox.py: python dropbox-shim.py status
+#
+import json
+import os
+import socket
+import sys
+
+HELPER_SOCKET = os.path.expanduser("~/.dropbox-app/helper_socket")
+DROPBOX_PY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dropbox.py")
+
+def run_locally():
+    sys.stdout.flush()
+    os.execv(sys.executable, [sys.executable, DROPBOX_PY] + sys.argv[1:])
+
+def main():
+    env = dict((name, value) for name, value in os.environ.items() if name.startswith("DROPBOX_"))
+    try:
+        request = json.dumps({"argv": sys.argv[1:], "cwd": os.getcwd(), "env": env})
+    except UnicodeDecodeError:
+        # the request is JSON, which can't carry bytes that aren't UTF-8
+        run_locally()
+
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        s.connect(HELPER_SOCKET)
+        f = s.makefile("r+", 4096)
+        f.write(request + "\n")
+        f.flush()
+    except socket.error:
+        run_locally()
+
+    streams = {"1": sys.stdout, "2": sys.stderr}
+    answered = False
+    while True:
+        try:
+            header = f.readline()
+        except socket.error:
+            header = ""
+        if not header:
+            # the helper died; only safe to retry if it never started
+            if not answered:
+                run_locally()
+            return 1
+
+        kind, length = header.split()
+        if kind == "r":
+            s.close()
+            run_locally()
+        elif kind == "x":
+            return int(length)
+
+        answered = True
+        streams[kind].write(f.read(int(length)))
+        if kind == "2":
+            sys.stderr.flush()
+
+if __name__ == "__main__":
+    sys.exit(main())
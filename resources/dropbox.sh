@@ -1,26 +1,15 @@
 #!/bin/bash
 DROPBOX="/home/$1/Dropbox"
-HELPER="python /home/$1/.dropbox-app/dropbox.py"
-EXCLUDE_FILES=""
+HELPER="python /home/$1/.dropbox-app/dropbox-shim.py"
+
+# Keep the resident helper alive so the shim has something to talk to,
+# it exits by itself after an hour without commands.
+python /home/$1/.dropbox-app/dropbox.py serve -d
 
 mkdir -p $DROPBOX;
 mkdir -p $DROPBOX/Koding;
 
-$HELPER status > /dev/null
-
-if [ $? -ne 0 ]; then
-  for file in $DROPBOX/*; do
-    if [[ $file != $DROPBOX/Koding ]]; then
-      
-      # Dropbox python script cant read paths with spaces in
-      # it becuase of how it parses arguments from cli.
-      # This replaces spaces with ||. Then the python
-      # script goes back and converts it back to a space.
-      EXCLUDE_FILES+="${file// /--} ";
-    fi
-  done
-
-  if [[ $EXCLUDE_FILES != "" ]]; then
-    $HELPER exclude add $EXCLUDE_FILES;
-  fi
-fi
\ No newline at end of file
+# Exclude everything at the top of the Dropbox folder but Koding. Only
+# entries missing from the ignore set are sent, so once everything is
+# excluded this is a single round trip to the daemon.
+$HELPER exclude sync --keep Koding "$DROPBOX" > /dev/null
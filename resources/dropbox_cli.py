@@ -0,0 +1,3571 @@
+#!/usr/bin/python
+#
+# Copyright (c) Dropbox, Inc.
+#
+# dropbox_cli
+# Dropbox frontend, run through the dropbox.py script next to it
+# This file is part of nautilus-dropbox 1.6.1.
+#
+# nautilus-dropbox is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# nautilus-dropbox is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with nautilus-dropbox.  If not, see <http://www.gnu.org/licenses/>.
+#
+from __future__ import with_statement
+
+import collections
+import errno
+import locale
+import os
+import sys
+import threading
+import time
+
+class LazyModule(object):
+    """Stands in for a module until it is first used, then imports it and
+    replaces itself in this module's globals. Keeps commands like
+    "running" from paying for the download and install machinery."""
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        module = __import__(self._name)
+        globals()[self._name] = module
+        return getattr(module, attr)
+
+ctypes = LazyModule("ctypes")
+fcntl = LazyModule("fcntl")
+httplib = LazyModule("httplib")
+hashlib = LazyModule("hashlib")
+json = LazyModule("json")
+optparse = LazyModule("optparse")
+platform = LazyModule("platform")
+Queue = LazyModule("Queue")
+select = LazyModule("select")
+shlex = LazyModule("shlex")
+shutil = LazyModule("shutil")
+socket = LazyModule("socket")
+StringIO = LazyModule("StringIO")
+struct = LazyModule("struct")
+subprocess = LazyModule("subprocess")
+tarfile = LazyModule("tarfile")
+tempfile = LazyModule("tempfile")
+termios = LazyModule("termios")
+traceback = LazyModule("traceback")
+urllib = LazyModule("urllib")
+urllib2 = LazyModule("urllib2")
+
+# python-gpgme and a scandir implementation are optional, see
+# load_gpgme() and load_scandir()
+gpgme = None
+scandir = None
+# see load_monotonic()
+monotonic = None
+# see terminal_width()
+terminal_columns = None
+# see load_dist_cache()
+dist_cache = None
+
+from contextlib import closing, contextmanager
+from posixpath import curdir, sep, pardir, join, abspath, commonprefix
+
+INFO = u"Dropbox is the easiest way to share and store your files online. Want to learn more? Head to"
+LINK = u"https://www.dropbox.com/"
+WARNING = u"In order to use Dropbox, you must download the proprietary daemon."
+GPG_WARNING = u"Note: neither python-gpgme nor gpg is installed, we will not be able to verify binary signatures."
+ERROR_CONNECTING = u"Trouble connecting to Dropbox servers. Maybe your internet connection is down, or you need to set your http_proxy environment variable."
+ERROR_SIGNATURE = u"Downloaded binary does not match Dropbox signature, aborting install."
+ERROR_SIGNATURE_KEY = u"Couldn't set up the Dropbox signing key for verification, aborting install."
+ERROR_NO_VERIFIER = u"Can't verify the download without python-gpgme or gpg. Install one of them, or set DROPBOX_INSECURE_INSTALL=1 to install without checking the signature."
+
+DOWNLOAD_LOCATION_FMT = "https://www.dropbox.com/download?plat=%s"
+SIGNATURE_LOCATION_FMT = "https://www.dropbox.com/download?plat=%s&signature=1"
+
+# times a dropped download is resumed before giving up
+DOWNLOAD_RETRIES = 5
+# extraction copies files with writes this big and hands fsync/chmod
+# work to this many threads
+EXTRACT_BUFSIZE = 1 << 20
+EXTRACT_WORKERS = 4
+
+# verified daemon archives are kept here, DROPBOX_DIST_CACHE overrides it
+# ("" disables) and DROPBOX_DIST_CACHE_SIZE sets the limit in megabytes
+DIST_CACHE_PATH = u"~/.dropbox-app/dist-cache"
+
+DOWNLOADING = u"Downloading Dropbox... %d%%"
+UNPACKING = u"Unpacking Dropbox... %d%%"
+
+PARENT_DIR = os.path.expanduser("~")
+DROPBOXD_PATH = "%s/.dropbox-dist/dropboxd" % PARENT_DIR
+DESKTOP_FILE = u"/usr/share/applications/dropbox.desktop"
+COMMAND_SOCKET = u"~/.dropbox/command_socket"
+# commands that do the same thing if the daemon gets them twice, so they
+# can be resent when a connection drops before the reply
+IDEMPOTENT_COMMANDS = frozenset([u"get_dropbox_status", u"icon_overlay_file_status",
+                                 u"get_ignore_set", u"ignore_set_add", u"ignore_set_remove",
+                                 u"get_public_link"])
+PID_FILE = u"~/.dropbox/dropbox.pid"
+# requests kept in flight when pipelining per-file commands
+PIPELINE_WINDOW = 64
+# daemon replies are read this many bytes at a time; a single field
+# (one path, one status) longer than RESPONSE_FIELD_LIMIT is refused
+RESPONSE_BUFSIZE = 1 << 16
+RESPONSE_FIELD_LIMIT = 1 << 20
+# daemon replies are cached in this directory for DROPBOX_CACHE_TTL seconds,
+# per-file statuses for DROPBOX_FILE_CACHE_TTL seconds (both default 0, off)
+STATUS_CACHE_PATH = u"~/.dropbox-app/status-cache"
+# per-file statuses are looked up in the cache this many at a time
+STATUS_CACHE_BATCH = 256
+# the script that runs this module, for starting "serve" in the background
+DROPBOX_PY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dropbox.py")
+# where "dropbox serve" listens for dropbox-shim.py, and how long it
+# waits for a client to send its request
+HELPER_SOCKET = u"~/.dropbox-app/helper_socket"
+SERVE_REQUEST_TIMEOUT = 2
+# exclude add/remove send at most this many paths per request
+IGNORE_CHUNK_SIZE = 256
+IGNORE_CHUNK_RETRIES = 3
+# output that isn't going to a terminal is written out in blocks this big
+CONSOLE_BUFSIZE = 1 << 16
+
+enc = locale.getpreferredencoding()
+
+# Downloads are only trusted if signed by this key, see signature_verifier()
+DROPBOX_KEY_FINGERPRINT = "1C61A2656FB57B7E4DE0F4C1FC918B335044912E"
+GPG_HOME = u"~/.dropbox-app/gnupg"
+
+# Available from https://linux.dropbox.com/fedora/rpm-public-key.asc
+DROPBOX_PUBLIC_KEY = """
+-----BEGIN PGP PUBLIC KEY BLOCK-----
+Version: SKS 1.1.0
+
+mQENBEt0ibEBCACv4hZRPqwtpU6z8+BB5YZU1a3yjEvg2W68+a6hEwxtCa2U++4dzQ+7EqaU
+q5ybQnwtbDdpFpsOi9x31J+PCpufPUfIG694/0rlEpmzl2GWzY8NqfdBFGGm/SPSSwvKbeNc
+FMRLu5neo7W9kwvfMbGjHmvUbzBUVpCVKD0OEEf1q/Ii0Qcekx9CMoLvWq7ZwNHEbNnij7ec
+nvwNlE2MxNsOSJj+hwZGK+tM19kuYGSKw4b5mR8IyThlgiSLIfpSBh1n2KX+TDdk9GR+57TY
+vlRu6nTPu98P05IlrrCP+KF0hYZYOaMvQs9Rmc09tc/eoQlN0kkaBWw9Rv/dvLVc0aUXABEB
+AAG0MURyb3Bib3ggQXV0b21hdGljIFNpZ25pbmcgS2V5IDxsaW51eEBkcm9wYm94LmNvbT6J
+ATYEEwECACAFAkt0ibECGwMGCwkIBwMCBBUCCAMEFgIDAQIeAQIXgAAKCRD8kYszUESRLi/z
+B/wMscEa15rS+0mIpsORknD7kawKwyda+LHdtZc0hD/73QGFINR2P23UTol/R4nyAFEuYNsF
+0C4IAD6y4pL49eZ72IktPrr4H27Q9eXhNZfJhD7BvQMBx75L0F5gSQwuC7GdYNlwSlCD0AAh
+Qbi70VBwzeIgITBkMQcJIhLvllYo/AKD7Gv9huy4RLaIoSeofp+2Q0zUHNPl/7zymOqu+5Ox
+e1ltuJT/kd/8hU+N5WNxJTSaOK0sF1/wWFM6rWd6XQUP03VyNosAevX5tBo++iD1WY2/lFVU
+JkvAvge2WFk3c6tAwZT/tKxspFy4M/tNbDKeyvr685XKJw9ei6GcOGHD
+=5rWG
+-----END PGP PUBLIC KEY BLOCK-----
+"""
+
+# Futures
+
+def methodcaller(name, *args, **kwargs):
+    def caller(obj):
+        return getattr(obj, name)(*args, **kwargs)
+    return caller
+
+def relpath(path, start=curdir):
+    """Return a relative version of a path"""
+
+    if not path:
+        raise ValueError("no path specified")
+
+    if type(start) is unicode:
+        start_list = unicode_abspath(start).split(sep)
+    else:
+        start_list = abspath(start).split(sep)
+
+    if type(path) is unicode:
+        path_list = unicode_abspath(path).split(sep)
+    else:
+        path_list = abspath(path).split(sep)
+
+    # Work out how much of the filepath is shared by start and path.
+    i = len(commonprefix([start_list, path_list]))
+
+    rel_list = [pardir] * (len(start_list)-i) + path_list[i:]
+    if not rel_list:
+        return curdir
+    return join(*rel_list)
+
+# End Futures
+
+
+class Console(object):
+    """Encoded output to one stream. What the stream is (a terminal, and
+    one that shows color) is worked out once. Lines are written out as
+    they end on a terminal, immediately if `unbuffered`, and otherwise
+    gathered up and written CONSOLE_BUFSIZE bytes at a time."""
+    def __init__(self, stream, unbuffered=False):
+        self.stream = stream
+        self.pending = []
+        self.size = 0
+        try:
+            self.tty = stream.isatty()
+        except (AttributeError, ValueError):
+            self.tty = False
+        term = os.environ.get('TERM', '')
+        self.color = self.tty and (term.startswith('vt') or
+                                   term.startswith('linux') or
+                                   'xterm' in term or
+                                   'color' in term)
+        self.unbuffered = unbuffered
+
+    def write(self, data, linebreak=False):
+        self.pending.append(data)
+        self.size += len(data)
+        if self.unbuffered or (linebreak and self.tty) or self.size >= CONSOLE_BUFSIZE:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            data = "".join(self.pending)
+            del self.pending[:]
+            self.size = 0
+            self.stream.write(data)
+        self.stream.flush()
+
+# one Console per stream; serve swaps sys.stdout and sys.stderr for each
+# client, so they are looked up per call
+consoles = {}
+
+def console(f=None):
+    if f is None: f = sys.stdout
+    c = consoles.get(f)
+    if c is None:
+        c = consoles[f] = Console(f, unbuffered=f is sys.stderr)
+    return c
+
+def flush_consoles():
+    for c in consoles.values():
+        c.flush()
+
+def console_print(st=u"", f=None, linebreak=True):
+    assert type(st) is unicode
+    if timings is not None: start = timings.clock()
+    c = console(f)
+    if c.unbuffered and f is not sys.stdout:
+        # keep what was printed before it ahead of it
+        console().flush()
+    data = st.encode(enc)
+    if linebreak: data += os.linesep
+    c.write(data, linebreak)
+    if timings is not None: timings.add(u"output", timings.clock() - start)
+
+def console_flush(f=None):
+    with timed(u"output"):
+        console(f).flush()
+
+class RecordWriter(object):
+    """Writes command results as JSON for --format: one object per line
+    for "ndjson", or one array for "json" that is written out element by
+    element rather than built up first."""
+    def __init__(self, format):
+        self.format = format
+        self.count = 0
+
+    def write(self, record):
+        with timed(u"output"):
+            self.write_record(record)
+
+    def write_record(self, record):
+        c = console()
+        if self.format == "json":
+            c.write((",\n" if self.count else "[\n") + json.dumps(record))
+        else:
+            c.write(json.dumps(record) + "\n", True)
+        self.count += 1
+
+    def close(self):
+        if self.format == "json":
+            console().write("\n]\n" if self.count else "[]\n", True)
+
+# set while a command runs with --format=json or --format=ndjson
+output = None
+
+def emit(record, text=None):
+    """Outputs one result of a command: `record` when structured output
+    was asked for, otherwise `text`, if there is any."""
+    if output is not None:
+        output.write(record)
+    elif text is not None:
+        console_print(text)
+
+def emit_error(message):
+    emit({u"error": message}, message)
+
+def print_usage(meth):
+    """Prints the help of command `meth` after bad arguments; with
+    --format, an error record giving its synopsis lines instead."""
+    if output is not None:
+        synopsis = meth.__doc__.split(u"\n\n", 1)[0].splitlines()[1:]
+        emit_error(u"usage: %s" % u"\n       ".join(synopsis))
+    else:
+        console_print(meth.__doc__, linebreak=False)
+
+def env_setting(name, default, kind=float):
+    """Returns the number in environment variable `name`, or `default`
+    when it isn't set. A value that isn't a number is warned about and
+    `default` used instead, rather than failing the command."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    try:
+        return kind(value)
+    except ValueError:
+        console_print(u"Ignoring %s=%s, it isn't a number. Using %s." %
+                      (name, value.decode(enc, "replace"), default), f=sys.stderr)
+        return default
+
+def load_monotonic():
+    """Returns a monotonic clock in seconds: time.monotonic when there is
+    one, clock_gettime(CLOCK_MONOTONIC) through ctypes otherwise, and
+    time.time as a last resort."""
+    global monotonic
+    if monotonic is None:
+        try:
+            from time import monotonic as clock
+        except ImportError:
+            try:
+                class timespec(ctypes.Structure):
+                    _fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+                clock_gettime = ctypes.CDLL(None, use_errno=True).clock_gettime
+                clock_gettime.argtypes = [ctypes.c_int, ctypes.POINTER(timespec)]
+                ts = timespec()
+                ref = ctypes.byref(ts)
+                def clock():
+                    # 1 is CLOCK_MONOTONIC on Linux
+                    if clock_gettime(1, ref):
+                        raise OSError(ctypes.get_errno(), "clock_gettime failed")
+                    return ts.tv_sec + ts.tv_nsec * 1e-9
+                clock()
+            except (OSError, AttributeError):
+                clock = time.time
+        monotonic = clock
+    return monotonic
+
+class Histogram(object):
+    """Counts durations in power of two buckets of microseconds."""
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = {}
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        bucket = int(seconds * 1e6).bit_length()
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def percentile(self, fraction):
+        # upper bound of the bucket the percentile falls in
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= fraction * self.count:
+                return min((1 << bucket) / 1e6, self.max)
+        return self.max
+
+    def record(self):
+        return {u"count": self.count, u"total": self.total, u"max": self.max,
+                u"buckets": dict((unicode(b), n) for b, n in self.buckets.iteritems())}
+
+class Timings(object):
+    """Named Histograms for one invocation, safe to add to from the
+    download and extraction threads."""
+    def __init__(self):
+        self.clock = load_monotonic()
+        self.start = self.clock()
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def add(self, name, seconds):
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(seconds)
+
+    @contextmanager
+    def timed(self, name):
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self.add(name, self.clock() - start)
+
+    def report(self, f):
+        console_print(u"%-28s %7s %10s %10s %10s %10s" %
+                      (u"phase", u"count", u"total ms", u"mean ms", u"p90 ms", u"max ms"), f=f)
+        for name in sorted(self.histograms, key=lambda n: -self.histograms[n].total):
+            h = self.histograms[name]
+            console_print(u"%-28s %7d %10.2f %10.3f %10.3f %10.3f" %
+                          (name, h.count, h.total * 1e3, h.total * 1e3 / h.count,
+                           h.percentile(0.9) * 1e3, h.max * 1e3), f=f)
+        console_print(u"%-28s %7s %10.2f" % (u"wall", u"", (self.clock() - self.start) * 1e3), f=f)
+
+    def append_to(self, path, argv, result):
+        record = {u"time": time.time(), u"pid": os.getpid(),
+                  u"argv": [arg.decode(enc, "replace") for arg in argv],
+                  u"exit": result if isinstance(result, int) else 0,
+                  u"wall": self.clock() - self.start,
+                  u"timings": dict((name, h.record()) for name, h in self.histograms.iteritems())}
+        # one write on an O_APPEND descriptor, so concurrent runs don't interleave
+        fd = os.open(os.path.expanduser(path), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0600)
+        try:
+            os.write(fd, json.dumps(record) + "\n")
+        finally:
+            os.close(fd)
+
+class NotTimed(object):
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        return False
+
+not_timed = NotTimed()
+
+# set while a command runs with --profile or DROPBOX_STATS_FILE
+timings = None
+
+def timed(name):
+    """Context manager adding the time spent in its block to `name`'s
+    histogram, when timings are being collected."""
+    if timings is None:
+        return not_timed
+    return timings.timed(name)
+
+def yes_no_question(question):
+    while True:
+        console_print(question, linebreak=False)
+        console_print(u" [y/n] ", linebreak=False)
+        console_flush()
+        text = raw_input()
+        if text.lower().startswith("y"):
+            return True
+        elif text.lower().startswith("n"):
+            return False
+        else:
+            console_print(u"Sorry, I didn't understand that. Please type yes or no.")
+
+def plat():
+    if sys.platform.lower().startswith('linux'):
+        arch = platform.machine()
+        if (arch[0] == 'i' and
+            arch[1].isdigit() and
+            arch[2:4] == '86'):
+            plat = "x86"
+        elif arch == 'x86_64':
+            plat = arch
+        else:
+            FatalVisibleError("Platform not supported")
+        return "lnx.%s" % plat
+    else:
+        FatalVisibleError("Platform not supported")
+
+class LivenessProbe(object):
+    """Tells whether dropboxd is installed, running and accepting
+    connections on its command socket. What the pidfile and
+    /proc/<pid>/cmdline said is kept until the pidfile is replaced or
+    rewritten or the process it names is gone, so wait_for_dropbox()
+    polling it and the commands of one "serve" or "batch" don't read
+    them again each time."""
+    def __init__(self):
+        self.key = None
+        self.pid = None
+        self.started = None
+        self.dropbox = False
+
+    def installed(self):
+        db_path = os.path.expanduser(u"~/.dropbox-dist/dropboxd").encode(sys.getfilesystemencoding())
+        return os.access(db_path, os.X_OK)
+
+    def running(self):
+        pidfile = os.path.expanduser(PID_FILE)
+        try:
+            st = os.stat(pidfile)
+        except OSError:
+            self.key = None
+            return False
+
+        key = (st.st_dev, st.st_ino, st.st_mtime, st.st_size)
+        if key == self.key:
+            if self.pid is None:
+                return False
+            try:
+                # a pid that was reused is a different /proc entry
+                if os.stat("/proc/%d" % self.pid).st_ctime == self.started:
+                    return self.dropbox
+            except OSError:
+                return False
+
+        self.key = key
+        self.pid, self.started, self.dropbox = None, None, False
+        try:
+            with open(pidfile, "r") as f:
+                pid = int(f.read())
+            started = os.stat("/proc/%d" % pid).st_ctime
+            with open("/proc/%d/cmdline" % pid, "r") as f:
+                cmdline = f.read().lower()
+        except (IOError, OSError, ValueError):
+            return False
+        self.pid, self.started, self.dropbox = pid, started, "dropbox" in cmdline
+        return self.dropbox
+
+    def responding(self, timeout=1):
+        """Only tries to connect, no request is sent."""
+        s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        s.settimeout(timeout)
+        try:
+            s.connect(os.path.expanduser(COMMAND_SOCKET))
+            return True
+        except socket.error:
+            return False
+        finally:
+            s.close()
+
+liveness = LivenessProbe()
+
+def is_dropbox_running():
+    return liveness.running()
+
+def unicode_abspath(path):
+    global enc
+    assert type(path) is unicode
+    # shouldn't pass unicode to this craphead, it appends with os.getcwd() which is always a str
+    return os.path.abspath(path.encode(sys.getfilesystemencoding())).decode(sys.getfilesystemencoding())
+
+def load_gpgme():
+    global gpgme
+    if gpgme is None:
+        try:
+            import gpgme as module
+        except ImportError:
+            module = False
+        gpgme = module
+    return gpgme
+
+@contextmanager
+def gnupg_home(home):
+    previous = os.environ.get('GNUPGHOME')
+    os.environ['GNUPGHOME'] = home
+    try:
+        yield
+    finally:
+        if previous is None:
+            del os.environ['GNUPGHOME']
+        else:
+            os.environ['GNUPGHOME'] = previous
+
+def find_executable(names):
+    for directory in os.environ.get("PATH", os.defpath).split(os.pathsep):
+        for name in names:
+            path = os.path.join(directory, name)
+            if os.access(path, os.X_OK) and not os.path.isdir(path):
+                return path
+    return None
+
+class SignatureVerifyError(Exception):
+    pass
+
+class GpgmeVerifier(object):
+    def __init__(self, home):
+        self.home = home
+
+    def has_key(self):
+        with gnupg_home(self.home):
+            try:
+                key = gpgme.Context().get_key(DROPBOX_KEY_FINGERPRINT)
+            except gpgme.GpgmeError:
+                return False
+        return key.subkeys[0].fpr == DROPBOX_KEY_FINGERPRINT
+
+    def import_key(self, key):
+        with gnupg_home(self.home):
+            gpgme.Context().import_(StringIO.StringIO(key))
+
+    def verify(self, sig_file, plain_file):
+        with gnupg_home(self.home):
+            sigs = gpgme.Context().verify(sig_file, plain_file, None)
+        return bool(sigs) and sigs[0].status == None and sigs[0].fpr == DROPBOX_KEY_FINGERPRINT
+
+class GpgVerifier(object):
+    """Verifies with the gpg command line tool, for when python-gpgme
+    isn't installed. The signed data is streamed to gpg's stdin."""
+    def __init__(self, binary, home):
+        self.binary = binary
+        self.home = home
+
+    def gpg(self, *args, **kw):
+        return subprocess.Popen([self.binary, "--homedir", self.home, "--batch", "--no-tty"] + list(args),
+                                stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                stderr=open(os.devnull, "w"), close_fds=True, **kw)
+
+    def has_key(self):
+        out = self.gpg("--with-colons", "--fingerprint", DROPBOX_KEY_FINGERPRINT).communicate()[0]
+        return ("fpr:::::::::%s:" % DROPBOX_KEY_FINGERPRINT) in out
+
+    def import_key(self, key):
+        self.gpg("--import").communicate(key)
+
+    def verify(self, sig_file, plain_file):
+        fd, sig_path = tempfile.mkstemp(prefix="dropbox-signature.")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(sig_file.read())
+            p = self.gpg("--status-fd", "1", "--verify", sig_path, "-")
+            try:
+                shutil.copyfileobj(plain_file, p.stdin, EXTRACT_BUFSIZE)
+            except IOError, e:
+                # gpg gave up early and closed its end
+                if e.errno != errno.EPIPE:
+                    raise
+            status = p.communicate()[0]
+        finally:
+            os.remove(sig_path)
+        # VALIDSIG carries the full fingerprint of the key that signed
+        return p.returncode == 0 and any(line.split()[2:3] == [DROPBOX_KEY_FINGERPRINT]
+                                         for line in status.splitlines()
+                                         if line.startswith("[GNUPG:] VALIDSIG "))
+
+signature_verifier_cache = []
+
+def signature_verifier():
+    """Returns a verifier holding Dropbox's public key, or None if
+    neither python-gpgme nor a gpg binary is available. The keyring in
+    GPG_HOME is built on first use and kept for later installs; it is
+    rebuilt if it doesn't hold the key with the expected fingerprint."""
+    if signature_verifier_cache:
+        return signature_verifier_cache[0]
+
+    home = os.path.expanduser(GPG_HOME)
+    if load_gpgme():
+        verifier = GpgmeVerifier(home)
+    else:
+        binary = find_executable(["gpg", "gpg2"])
+        verifier = GpgVerifier(binary, home) if binary else None
+
+    if verifier is not None and not (os.path.isdir(home) and verifier.has_key()):
+        shutil.rmtree(home, ignore_errors=True)
+        os.makedirs(home, 0700)
+        verifier.import_key(DROPBOX_PUBLIC_KEY)
+        if not verifier.has_key():
+            raise SignatureVerifyError("Couldn't load the Dropbox signing key")
+
+    signature_verifier_cache.append(verifier)
+    return verifier
+
+def verify_signature(sig_file, plain_file):
+    return signature_verifier().verify(sig_file, plain_file)
+
+def download_file_chunk(url, buf, offset=0):
+    opener = urllib2.build_opener()
+    opener.addheaders = [('User-Agent', "DropboxLinuxDownloader/1.6.1")]
+    if offset:
+        opener.addheaders.append(('Range', "bytes=%d-" % offset))
+    sock = opener.open(url)
+
+    if offset and sock.getcode() != 206:
+        # the server ignored the range, start over
+        offset = 0
+        buf.seek(0)
+        buf.truncate()
+
+    size = offset + int(sock.info()['content-length'])
+    bufsize = max(size / 200, 4096)
+    progress = offset
+
+    with closing(sock) as f:
+        yield (float(progress)/size, True)
+        while progress < size:
+            try:
+                chunk = f.read(bufsize)
+                if not chunk:
+                    raise IOError(errno.ECONNRESET, "Connection closed after %d of %d bytes" % (progress, size))
+                progress += len(chunk)
+                buf.write(chunk)
+                yield (float(progress)/size, True)
+            except OSError, e:
+                if hasattr(e, 'errno') and e.errno == errno.EAGAIN:
+                    # nothing left to read
+                    yield (float(progress)/size, False)
+                else:
+                    raise
+
+def download_file(url, buf, retries=DOWNLOAD_RETRIES):
+    """Like download_file_chunk, but when the transfer fails it carries
+    on from what is already in `buf` with an HTTP Range request, up to
+    `retries` times."""
+    attempt = 0
+    while True:
+        try:
+            for progress in download_file_chunk(url, buf, buf.tell()):
+                yield progress
+            return
+        except (urllib2.URLError, httplib.HTTPException, socket.error, IOError), e:
+            # a missing file or bad request won't get better
+            if isinstance(e, urllib2.HTTPError) and e.code < 500:
+                raise
+            attempt += 1
+            if attempt > retries:
+                raise
+            time.sleep(min(2 ** attempt, 30))
+
+class GrowingFile(object):
+    """A temporary file that one thread writes while others read it
+    back as it grows. Readers block until more data arrives or the
+    writer calls finish() or fail()."""
+    def __init__(self):
+        self.f = tempfile.NamedTemporaryFile(prefix="dropbox-download.")
+        self.name = self.f.name
+        self.size = 0
+        # bytes of a restarted transfer that readers have already seen
+        self.skip = 0
+        self.done = False
+        self.failed = False
+        self.cond = threading.Condition()
+
+    def write(self, data):
+        if self.skip:
+            n = min(self.skip, len(data))
+            self.skip -= n
+            data = data[n:]
+        self.f.write(data)
+        self.f.flush()
+        with self.cond:
+            self.size += len(data)
+            self.cond.notify_all()
+
+    def tell(self):
+        return self.size - self.skip
+
+    def seek(self, offset):
+        assert offset == 0, "can only rewind to the start"
+
+    def truncate(self):
+        # The server ignored our Range and is sending everything again.
+        # It's the same file, so just drop what we already have.
+        self.skip = self.size
+
+    def finish(self):
+        with self.cond:
+            self.done = True
+            self.cond.notify_all()
+
+    def fail(self):
+        with self.cond:
+            self.failed = True
+            self.cond.notify_all()
+
+    def reader(self):
+        return GrowingFileReader(self)
+
+    def close(self):
+        self.fail()
+        self.f.close()
+
+    @property
+    def closed(self):
+        return self.f.closed
+
+class GrowingFileReader(object):
+    def __init__(self, growing):
+        self.growing = growing
+        self.f = open(growing.name, "rb")
+        self.pos = 0
+
+    def read(self, size=-1):
+        g = self.growing
+        with g.cond:
+            while self.pos >= g.size and not (g.done or g.failed):
+                g.cond.wait()
+            if g.failed:
+                raise IOError(errno.EIO, "Download failed")
+            available = g.size - self.pos
+        if size < 0 or size > available:
+            size = available
+        data = self.f.read(size)
+        self.pos += len(data)
+        return data
+
+    def tell(self):
+        return self.pos
+
+    def close(self):
+        self.f.close()
+
+class Worker(threading.Thread):
+    """Runs func(*args) in the background and keeps its result, or the
+    exception it raised, for wait() to hand back."""
+    def __init__(self, func, *args):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.func = func
+        self.args = args
+        self.result = None
+        self.error = None
+
+    def run(self):
+        try:
+            self.result = self.func(*self.args)
+        except Exception:
+            self.error = sys.exc_info()
+
+    def wait(self):
+        # join() with no timeout can't be interrupted with ^C
+        while self.isAlive():
+            self.join(0.1)
+        if self.error:
+            raise self.error[0], self.error[1], self.error[2]
+        return self.result
+
+def write_member(archive, member, path):
+    parent = os.path.dirname(path)
+    if not os.path.isdir(parent):
+        os.makedirs(parent)
+    source = archive.extractfile(member)
+    with open(path, "wb", EXTRACT_BUFSIZE) as target:
+        shutil.copyfileobj(source, target, EXTRACT_BUFSIZE)
+
+def extract_archive(f, dest, workers=EXTRACT_WORKERS):
+    """Extracts the gzipped tar stream `f` into `dest` in one pass. The
+    archive isn't verified yet, so anything that would land outside
+    `dest` is refused.
+
+    Regular files are written with large buffered writes. Syncing them to
+    disk and setting their owner, mode and times is left to `workers`
+    threads, which overlaps with decompressing the rest of the stream.
+    Directory attributes are set last, as TarFile.extractall does.
+    """
+    archive = tarfile.open(fileobj=f, mode='r|gz')
+    written = Queue.Queue(workers * 16)
+    errors = []
+
+    def finish_files():
+        while True:
+            item = written.get()
+            if item is None:
+                return
+            member, path = item
+            try:
+                fd = os.open(path, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+                archive.chown(member, path)
+                archive.chmod(member, path)
+                archive.utime(member, path)
+            except (OSError, IOError, tarfile.ExtractError), e:
+                errors.append(e)
+
+    finishers = [threading.Thread(target=finish_files) for i in range(workers)]
+    for t in finishers:
+        t.daemon = True
+        t.start()
+
+    directories = []
+    try:
+        for member in archive:
+            for name in (member.name, member.linkname if member.issym() or member.islnk() else u""):
+                if os.path.isabs(name) or pardir in name.split(sep):
+                    raise tarfile.TarError("Refusing to extract %r" % member.name)
+            path = os.path.join(dest, member.name)
+            if member.isreg():
+                write_member(archive, member, path)
+                written.put((member, path))
+            elif member.isdir():
+                if not os.path.isdir(path):
+                    os.makedirs(path, 0700)
+                directories.append((member, path))
+            else:
+                # links and the odd special file, there are few of them
+                archive.extract(member, dest)
+    finally:
+        for t in finishers:
+            written.put(None)
+        for t in finishers:
+            t.join()
+        archive.close()
+
+    if errors:
+        raise errors[0]
+
+    # deepest first, so setting a parent's mode can't lock us out
+    directories.sort(reverse=True, key=lambda item: item[0].name)
+    for member, path in directories:
+        archive.chown(member, path)
+        archive.utime(member, path)
+        archive.chmod(member, path)
+
+def swap_into_place(staging, parent):
+    """Moves everything in `staging` into `parent`, replacing entries of
+    the same name with a rename each so nothing is half written."""
+    for name in os.listdir(staging):
+        target = os.path.join(parent, name)
+        old = None
+        if os.path.lexists(target):
+            old = tempfile.mkdtemp(prefix="%s.old." % name, dir=parent)
+            os.rename(target, os.path.join(old, name))
+        os.rename(os.path.join(staging, name), target)
+        if old:
+            shutil.rmtree(old, ignore_errors=True)
+    os.rmdir(staging)
+
+class DistCache(object):
+    """Verified daemon archives kept on local disk, named after the
+    digest of their signature, so installs of a release after the first
+    unpack from here instead of the network. Point several machines at
+    the same directory to share it. Least recently used archives are
+    dropped once the directory holds more than `max_size` bytes.
+
+    Best effort: any error reading or writing the cache is ignored.
+    """
+    def __init__(self, path, max_size):
+        self.path = os.path.expanduser(path) if path else None
+        self.max_size = max_size
+
+    def archive_path(self, key):
+        return os.path.join(self.path, "%s.tar.gz" % key)
+
+    def lookup(self, key):
+        if not self.path:
+            return None
+        path = self.archive_path(key)
+        try:
+            # mtime is what eviction goes by
+            os.utime(path, None)
+        except OSError:
+            return None
+        return path
+
+    def store(self, key, src):
+        if not self.path:
+            return
+        try:
+            if not os.path.isdir(self.path):
+                os.makedirs(self.path)
+            fd, tmp = tempfile.mkstemp(prefix=".incoming.", dir=self.path)
+            try:
+                with os.fdopen(fd, "wb") as out:
+                    with open(src, "rb") as f:
+                        shutil.copyfileobj(f, out, 1 << 20)
+                # mkstemp makes it private, the cache may be shared
+                os.chmod(tmp, 0644)
+                os.rename(tmp, self.archive_path(key))
+            except:
+                os.remove(tmp)
+                raise
+            self.evict()
+        except (OSError, IOError):
+            pass
+
+    def evict(self):
+        entries = []
+        for name in os.listdir(self.path):
+            if name.endswith(".tar.gz") and not name.startswith("."):
+                st = os.stat(os.path.join(self.path, name))
+                entries.append((st.st_mtime, st.st_size, name))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        # always keep the newest, even if it alone is over the limit
+        for mtime, size, name in entries[:-1]:
+            if total <= self.max_size:
+                break
+            os.remove(os.path.join(self.path, name))
+            total -= size
+
+def load_dist_cache():
+    global dist_cache
+    if dist_cache is None:
+        dist_cache = DistCache(os.environ.get("DROPBOX_DIST_CACHE", DIST_CACHE_PATH),
+                               env_setting("DROPBOX_DIST_CACHE_SIZE", 512, int) << 20)
+    return dist_cache
+
+def as_url(location):
+    if "://" in location:
+        return location
+    return "file://" + urllib.pathname2url(os.path.abspath(os.path.expanduser(location)))
+
+def dist_locations():
+    """Returns where to get the daemon archive and its signature from,
+    honouring DROPBOX_MIRROR (a directory path or URL holding
+    dropbox-PLAT.tar.gz and dropbox-PLAT.tar.gz.sig)."""
+    mirror = os.environ.get("DROPBOX_MIRROR")
+    if not mirror:
+        return DOWNLOAD_LOCATION_FMT % plat(), SIGNATURE_LOCATION_FMT % plat()
+    archive = "%s/dropbox-%s.tar.gz" % (mirror.rstrip("/"), plat())
+    return as_url(archive), as_url(archive + ".sig")
+
+class DownloadState(object):
+    """Downloads, verifies and unpacks the daemon with the steps
+    overlapped: verification and extraction both read the archive as it
+    arrives. Extraction goes to a staging directory that only replaces
+    ~/.dropbox-dist once the signature checks out.
+
+    The signature is fetched first, it is what dist_cache is keyed by.
+    """
+    def __init__(self):
+        # the archive goes to disk as it arrives, not into memory
+        self.local_file = GrowingFile()
+        self.archive_location, self.signature_location = dist_locations()
+        self.signature = None
+        self.cache_key = None
+        self.cached = None
+        self.staging = None
+        self.extract_reader = None
+        self.workers = {}
+
+    def fetch_signature(self):
+        signature = StringIO.StringIO()
+        with timed(u"download signature"):
+            for _ in download_file(self.signature_location, signature):
+                pass
+        return signature.getvalue()
+
+    def verify(self):
+        signature = StringIO.StringIO(self.signature)
+        reader = self.local_file.reader()
+        try:
+            with timed(u"verify"):
+                return verify_signature(signature, reader)
+        finally:
+            reader.close()
+
+    def extract(self):
+        try:
+            with timed(u"extract"):
+                extract_archive(self.extract_reader, self.staging)
+        except:
+            shutil.rmtree(self.staging, ignore_errors=True)
+            raise
+        finally:
+            self.extract_reader.close()
+
+    def start_workers(self):
+        self.staging = tempfile.mkdtemp(prefix=".dropbox-dist.staging.", dir=PARENT_DIR)
+        self.extract_reader = self.local_file.reader()
+        self.workers["extract"] = Worker(self.extract)
+        if signature_verifier():
+            self.workers["verify"] = Worker(self.verify)
+        for worker in self.workers.itervalues():
+            worker.start()
+
+    def copy_data(self):
+        self.signature = self.fetch_signature()
+        self.cache_key = hashlib.sha256(self.signature).hexdigest()
+        self.cached = load_dist_cache().lookup(self.cache_key)
+
+        self.start_workers()
+        try:
+            location = as_url(self.cached) if self.cached else self.archive_location
+            with timed(u"download archive"):
+                for progress in download_file(location, self.local_file):
+                    yield progress
+        except Exception:
+            self.local_file.fail()
+            raise
+        finally:
+            self.local_file.finish()
+
+    def unpack(self):
+        extractor = self.workers["extract"]
+        with timed(u"unpack wait"):
+            while extractor.isAlive():
+                yield u"", self.extract_reader.tell(), self.local_file.size
+                extractor.join(0.1)
+
+        try:
+            extractor.wait()
+            verified = "verify" in self.workers
+            with timed(u"verify wait"):
+                if verified and not self.workers["verify"].wait():
+                    raise SignatureVerifyError()
+            with timed(u"swap into place"):
+                swap_into_place(self.staging, PARENT_DIR)
+        except:
+            shutil.rmtree(self.staging, ignore_errors=True)
+            raise
+
+        # only archives whose signature was checked are worth sharing
+        if verified and not self.cached:
+            with timed(u"dist cache store"):
+                load_dist_cache().store(self.cache_key, self.local_file.name)
+        yield u"", self.local_file.size, self.local_file.size
+
+    def cancel(self):
+        if not self.local_file.closed:
+            self.local_file.close()
+        if self.staging:
+            shutil.rmtree(self.staging, ignore_errors=True)
+
+def download(writeLog = False):
+    global FatalVisibleError
+    def FatalVisibleError(s):
+        console_print(u"\nError: %s" % s, f=sys.stderr)
+        sys.exit(-1)
+
+
+    ESC = "\x1b"
+    save = ESC+"7"
+    unsave = ESC+"8"
+    clear = ESC+"[2J"
+    erase_to_start = ESC+"[1K"
+    write = console().write
+    flush = console_flush
+
+    DOWNLOAD_OUT = "/tmp/_dropbox.download"
+    last_progress = [None, None]
+    def setprogress(text, frac):
+        if last_progress == [text, frac]:
+            return
+        if console().tty:
+            write(erase_to_start)
+            write(unsave)
+        console_print(text % int(100*frac), linebreak=not console().tty)
+ 	if writeLog:
+            open(DOWNLOAD_OUT, "w").write(text % int(100*frac))
+        if console().tty:
+            flush()
+        last_progress[0], last_progress[1] = text, frac
+
+    console_print()
+    if console().tty:
+        write(save)
+        flush()
+    console_print(u"%s %s\n" % (INFO, LINK))
+    try:
+        verifier = signature_verifier()
+    except SignatureVerifyError:
+        FatalVisibleError(ERROR_SIGNATURE_KEY)
+    if verifier is None:
+        if os.environ.get("DROPBOX_INSECURE_INSTALL") != "1":
+            FatalVisibleError(ERROR_NO_VERIFIER)
+        console_print(GPG_WARNING, f=sys.stderr)
+    GPG_WARNING_MSG = (u"\n%s" % GPG_WARNING) if not verifier else u""
+
+    # if not yes_no_question("%s%s" % (WARNING, GPG_WARNING_MSG)):
+    #     return
+
+    download = DownloadState()
+
+    try:
+        for progress, status in download.copy_data():
+            if not status:
+                break
+            setprogress(DOWNLOADING, progress)
+    except Exception:
+        download.cancel()
+        FatalVisibleError(ERROR_CONNECTING)
+    else:
+        setprogress(DOWNLOADING, 1.0)
+        console_print()
+        write(save)
+    finally:
+        if os.path.exists(DOWNLOAD_OUT):
+            os.remove(DOWNLOAD_OUT)
+
+    try:
+        for name, i, total in download.unpack():
+            setprogress(UNPACKING, float(i)/total)
+    except SignatureVerifyError:
+        download.cancel()
+        FatalVisibleError(ERROR_SIGNATURE)
+    except Exception:
+        download.cancel()
+        FatalVisibleError(ERROR_CONNECTING)
+    else:
+        setprogress(UNPACKING, 1.0)
+    finally:
+        if os.path.exists(DOWNLOAD_OUT):
+            os.remove(DOWNLOAD_OUT)
+
+    console_print()
+
+class CommandTicker(object):
+    """Spinner shown on stderr while waiting on slow daemon replies.
+
+    One thread serves the whole process and sleeps while no command is
+    waiting, so begin() and end() only update a counter. Nothing is shown
+    or started when stderr isn't a terminal, and a thread that died is
+    replaced by the next begin().
+    """
+    def __init__(self):
+        self.thread = None
+        self.cond = threading.Condition()
+        self.waiting = 0
+        self.since = 0
+        self.stream = None
+        self.enabled = False
+
+    def begin(self):
+        stream = sys.stderr
+        if stream is not self.stream:
+            self.stream = stream
+            try:
+                self.enabled = stream.isatty()
+            except (AttributeError, ValueError):
+                self.enabled = False
+        if not self.enabled:
+            return False
+
+        with self.cond:
+            if self.thread is None or not self.thread.isAlive():
+                self.thread = threading.Thread(target=self.run)
+                self.thread.daemon = True
+                self.thread.start()
+            self.waiting += 1
+            if self.waiting == 1:
+                self.since = time.time()
+                self.cond.notify()
+        return True
+
+    def end(self):
+        with self.cond:
+            self.waiting -= 1
+
+    def run(self):
+        ticks = ['[.  ]', '[.. ]', '[...]', '[ ..]', '[  .]', '[   ]']
+        while True:
+            with self.cond:
+                while not self.waiting:
+                    self.cond.wait()
+                since = self.since
+            time.sleep(0.25)
+            with self.cond:
+                if not self.waiting or self.since != since:
+                    continue
+            # stay quiet for the first round, most replies are quick
+            i = int((time.time() - since) / 0.25)
+            if i >= len(ticks):
+                try:
+                    self.stream.write("\r%s\r" % ticks[i % len(ticks)])
+                    self.stream.flush()
+                except (IOError, ValueError):
+                    # stderr went away, stop ticking on it
+                    self.enabled = False
+                    return
+
+command_ticker = CommandTicker()
+
+class DropboxCommand(object):
+    class CouldntConnectError(Exception): pass
+    class BadConnectionError(Exception): pass
+    # the socket failed under a read, as a connection the daemon dropped does
+    class ConnectionLostError(BadConnectionError): pass
+    class EOFError(Exception): pass
+    class CommandError(Exception): pass
+
+    def __init__(self, timeout=5):
+        self.timeout = timeout
+        self.connect()
+
+    def connect(self):
+        self.s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.s.settimeout(self.timeout)
+        try:
+            with timed(u"daemon connect"):
+                self.s.connect(os.path.expanduser(COMMAND_SOCKET))
+        except socket.error, e:
+            self.s.close()
+            raise DropboxCommand.CouldntConnectError()
+        self.f = self.s.makefile("r+", 4096)
+        # commands sent over this socket, used to tell a stale reused
+        # connection apart from one that died under a fresh request
+        self.used = 0
+
+    def reconnect(self):
+        self.close()
+        self.connect()
+
+    def settimeout(self, timeout):
+        self.timeout = timeout
+        self.s.settimeout(timeout)
+
+    def is_alive(self):
+        # An idle connection should never be readable: the daemon only
+        # talks in response to a request. Readable means EOF or garbage.
+        try:
+            readable = select.select([self.s], [], [], 0)[0]
+        except (select.error, socket.error, ValueError):
+            return False
+        return not readable
+
+    def close(self):
+        try:
+            self.f.close()
+        except socket.error:
+            pass
+        self.s.close()
+
+    def __readline(self):
+        try:
+            toret = self.f.readline().decode('utf8').rstrip(u"\n")
+        except socket.error, e:
+            raise DropboxCommand.ConnectionLostError()
+        if toret == '':
+            raise DropboxCommand.EOFError()
+        else:
+            return toret
+
+    def __iter_fields(self):
+        # The tab separated fields of the next line, read in bounded
+        # pieces so a huge line never sits in memory whole.
+        field = ""
+        while True:
+            try:
+                chunk = self.f.readline(RESPONSE_BUFSIZE)
+            except socket.error, e:
+                raise DropboxCommand.ConnectionLostError()
+            if not chunk:
+                raise DropboxCommand.EOFError()
+            end = chunk.endswith("\n")
+            parts = (chunk[:-1] if end else chunk).split("\t")
+            parts[0] = field + parts[0]
+            field = parts.pop()
+            for part in parts:
+                yield part.decode('utf8')
+            if end:
+                yield field.decode('utf8')
+                return
+            if len(field) > RESPONSE_FIELD_LIMIT:
+                raise DropboxCommand.BadConnectionError(u"reply field longer than %d bytes" % RESPONSE_FIELD_LIMIT)
+
+    @staticmethod
+    def encode(name, args):
+        return (name + u"\n" +
+                u"".join(u"\t".join([k] + (list(v)
+                                          if hasattr(v, '__iter__') else
+                                          [v])) + u"\n"
+                         for k,v in args.iteritems()) +
+                u"done\n").encode('utf8')
+
+    def __write_command(self, name, args, flush=True):
+        with timed(u"daemon write"):
+            self.f.write(DropboxCommand.encode(name, args))
+
+            if flush:
+                self.f.flush()
+
+    # atttribute doesn't exist, i know what you want
+    def send_command(self, name, args):
+        with timed(u"command " + name):
+            return self.__read_body(self.__send(name, args))
+
+    def stream_command(self, name, args):
+        """Like send_command, but yields the reply as (key, value) records
+        while it is being read instead of building a dict, so replies of
+        any size take bounded memory. A key sent without values is
+        yielded once, with None.
+
+        The connection is only usable again once the generator is
+        exhausted; abandoning it early closes the connection.
+        """
+        if not self.__send(name, args):
+            self.__read_error()
+
+        finished = False
+        try:
+            for record in self.__iter_body():
+                yield record
+            finished = True
+        finally:
+            if not finished:
+                self.close()
+
+    def __send(self, name, args):
+        reused = self.used > 0
+        self.used += 1
+        # The daemon drops connections it considers idle; a reused
+        # socket failing before any reply gets one fresh retry. Once the
+        # request went out the daemon may have acted on it, so only
+        # commands that are safe to run twice are retried then.
+        try:
+            self.__write_command(name, args)
+        except socket.error:
+            if not reused:
+                raise
+            return self.__resend(name, args)
+        try:
+            return self.__read_status()
+        except (DropboxCommand.EOFError, DropboxCommand.ConnectionLostError, socket.error):
+            if not reused or name not in IDEMPOTENT_COMMANDS:
+                raise
+            return self.__resend(name, args)
+
+    def __resend(self, name, args):
+        self.reconnect()
+        self.used += 1
+        self.__write_command(name, args)
+        return self.__read_status()
+
+    def __read_status(self):
+        ticking = command_ticker.begin()
+
+        # This is the potentially long-running call.
+        try:
+            with timed(u"daemon wait"):
+                return self.__readline() == u"ok"
+        except KeyboardInterrupt:
+            raise DropboxCommand.BadConnectionError("Keyboard interruption detected")
+        finally:
+            if ticking:
+                command_ticker.end()
+
+    def __iter_body(self):
+        while True:
+            fields = self.__iter_fields()
+            key = fields.next()
+            if key == u"done":
+                for extra in fields:
+                    pass
+                return
+            empty = True
+            for value in fields:
+                empty = False
+                yield key, value
+            if empty:
+                yield key, None
+
+    def __read_error(self):
+        problems = []
+        while True:
+            line = u"\t".join(self.__iter_fields())
+            if line == u"done":
+                break
+            problems.append(line)
+
+        raise DropboxCommand.CommandError(u"\n".join(problems))
+
+    def __read_body(self, ok):
+        with timed(u"daemon read"):
+            if not ok:
+                self.__read_error()
+            toret = {}
+            for key, value in self.__iter_body():
+                values = toret.setdefault(key, [])
+                if value is not None:
+                    values.append(value)
+            return toret
+
+    def pipeline_command(self, name, args_iter, window=PIPELINE_WINDOW):
+        """Sends `name` once for every args dict in `args_iter` without
+        waiting for each reply, keeping at most `window` requests in
+        flight. Yields the replies in request order; a request the
+        daemon refuses yields its CommandError instead of raising.
+
+        The connection is only usable again once every reply has been
+        consumed.
+        """
+        args_iter = iter(args_iter)
+        pending = 0
+        exhausted = False
+        while True:
+            if not exhausted and pending <= window // 2:
+                while pending < window:
+                    try:
+                        args = args_iter.next()
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    self.__write_command(name, args, flush=False)
+                    pending += 1
+                    self.used += 1
+                self.f.flush()
+
+            if pending == 0:
+                return
+
+            try:
+                with timed(u"daemon wait"):
+                    ok = self.__readline() == u"ok"
+            except KeyboardInterrupt:
+                raise DropboxCommand.BadConnectionError("Keyboard interruption detected")
+            pending -= 1
+
+            try:
+                reply = self.__read_body(ok)
+            except DropboxCommand.CommandError, e:
+                reply = e
+            yield reply
+
+    # this is the hotness, auto marshalling
+    def __getattr__(self, name):
+        try:
+            return super(DropboxCommand, self).__getattr__(name)
+        except:
+            def __spec_command(**kw):
+                return self.send_command(unicode(name), kw)
+            self.__setattr__(name, __spec_command)
+            return __spec_command
+
+class DropboxCommandPool(object):
+    """Hands out DropboxCommand connections and takes them back.
+
+    Idle connections are checked for liveness before being lent again,
+    so callers issuing many commands per process only pay for the
+    connect once. At most `size` connections are open at a time;
+    borrowing beyond that blocks until one is returned.
+    """
+    def __init__(self, size=4):
+        self.size = size
+        self.idle = []
+        self.lock = threading.Lock()
+        self.slots = threading.Semaphore(size)
+
+    def acquire(self, timeout=5):
+        self.slots.acquire()
+        try:
+            while True:
+                with self.lock:
+                    dc = self.idle.pop() if self.idle else None
+                if dc is None:
+                    return DropboxCommand(timeout=timeout)
+                if dc.is_alive():
+                    dc.settimeout(timeout)
+                    return dc
+                dc.close()
+        except:
+            self.slots.release()
+            raise
+
+    def release(self, dc, discard=False):
+        try:
+            if discard:
+                dc.close()
+            else:
+                with self.lock:
+                    self.idle.append(dc)
+        finally:
+            self.slots.release()
+
+    @contextmanager
+    def connection(self, timeout=5):
+        dc = self.acquire(timeout)
+        try:
+            yield dc
+        except DropboxCommand.CommandError:
+            # the daemon answered in full, the socket is still in sync
+            self.release(dc)
+            raise
+        except:
+            self.release(dc, discard=True)
+            raise
+        else:
+            self.release(dc)
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for dc in idle:
+            dc.close()
+
+command_pool = DropboxCommandPool()
+
+class ReplyParser(object):
+    """Incremental parser for a stream of daemon replies, for callers
+    that read the socket themselves. feed() returns the replies completed
+    by the data it was given: a dict like send_command's, or the
+    CommandError of a refused request.
+    """
+    def __init__(self):
+        self.field = ""
+        self.line = []
+        self.ok = None
+        self.body = None
+
+    def feed(self, data):
+        replies = []
+        lines = data.split("\n")
+        last = len(lines) - 1
+        for i, chunk in enumerate(lines):
+            parts = chunk.split("\t")
+            parts[0] = self.field + parts[0]
+            self.field = parts.pop()
+            self.line.extend(part.decode('utf8') for part in parts)
+            if i < last:
+                self.line.append(self.field.decode('utf8'))
+                self.field = ""
+                reply = self.end_line(self.line)
+                self.line = []
+                if reply is not None:
+                    replies.append(reply)
+        if len(self.field) > RESPONSE_FIELD_LIMIT:
+            raise DropboxCommand.BadConnectionError(u"reply field longer than %d bytes" % RESPONSE_FIELD_LIMIT)
+        return replies
+
+    def end_line(self, fields):
+        if self.ok is None:
+            self.ok = fields == [u"ok"]
+            self.body = {} if self.ok else []
+        elif fields == [u"done"]:
+            ok, body = self.ok, self.body
+            self.ok = self.body = None
+            return body if ok else DropboxCommand.CommandError(u"\n".join(body))
+        elif self.ok:
+            self.body.setdefault(fields[0], []).extend(fields[1:])
+        else:
+            self.body.append(u"\t".join(fields))
+
+class CommandMultiplexer(object):
+    """Runs many daemon requests at once from a single thread, with no
+    ticker or thread per request.
+
+    Requests for the same socket are pipelined over up to `connections`
+    sockets with at most `window` in flight on each, and no more than
+    `limit` requests are taken from the caller at a time. A request not
+    answered within `timeout` seconds of being sent fails with
+    socket.timeout, along with everything behind it on its connection.
+    """
+    class Connection(object):
+        def __init__(self, path, timeout):
+            self.path = path
+            self.s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.s.settimeout(timeout)
+            try:
+                with timed(u"daemon connect"):
+                    self.s.connect(path)
+            except socket.error, e:
+                self.s.close()
+                raise DropboxCommand.CouldntConnectError()
+            self.s.setblocking(0)
+            self.parser = ReplyParser()
+            self.out = ""
+            # (tag, deadline) of each request sent, oldest first
+            self.inflight = collections.deque()
+
+    def __init__(self, connections=4, window=PIPELINE_WINDOW, limit=1024, timeout=5):
+        self.connections = connections
+        self.window = window
+        self.limit = limit
+        self.timeout = timeout
+
+    def run(self, requests):
+        """Sends each (tag, name, args) or (tag, name, args, socket_path)
+        in `requests` and yields (tag, reply) as the replies arrive, in no
+        particular order. `reply` is the reply dict, or the exception the
+        request failed with. `socket_path` defaults to the local daemon's.
+        """
+        requests = iter(requests)
+        exhausted = False
+        queued = {}
+        waiting = 0
+        conns = {}
+        by_fd = {}
+        poller = select.poll()
+        done = []
+
+        def close(conn, error):
+            poller.unregister(conn.s)
+            del by_fd[conn.s.fileno()]
+            conns[conn.path].remove(conn)
+            conn.s.close()
+            for tag, deadline in conn.inflight:
+                done.append((tag, error))
+
+        try:
+            while True:
+                while not exhausted and waiting < self.limit:
+                    try:
+                        request = requests.next()
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    tag, name, args = request[:3]
+                    path = os.path.expanduser(request[3] if len(request) > 3 else COMMAND_SOCKET)
+                    queued.setdefault(path, collections.deque()).append((tag, name, args))
+                    waiting += 1
+
+                now = time.time()
+                for path in queued.keys():
+                    queue = queued[path]
+                    path_conns = conns.setdefault(path, [])
+                    while queue:
+                        conn = min(path_conns, key=lambda c: len(c.inflight)) if path_conns else None
+                        if conn is None or (len(conn.inflight) >= self.window and
+                                            len(path_conns) < self.connections):
+                            try:
+                                conn = CommandMultiplexer.Connection(path, self.timeout)
+                            except DropboxCommand.CouldntConnectError, e:
+                                if path_conns:
+                                    # make do with the ones we have
+                                    break
+                                while queue:
+                                    done.append((queue.popleft()[0], e))
+                                break
+                            path_conns.append(conn)
+                            by_fd[conn.s.fileno()] = conn
+                            poller.register(conn.s, select.POLLIN)
+                        elif len(conn.inflight) >= self.window:
+                            break
+                        tag, name, args = queue.popleft()
+                        conn.out += DropboxCommand.encode(name, args)
+                        conn.inflight.append((tag, now + self.timeout))
+                    if not queue:
+                        del queued[path]
+
+                for tag, reply in done:
+                    waiting -= 1
+                    yield tag, reply
+                del done[:]
+
+                inflight = [conn for conn in by_fd.itervalues() if conn.inflight]
+                if not inflight:
+                    if exhausted and not queued:
+                        return
+                    continue
+
+                for conn in inflight:
+                    poller.modify(conn.s, select.POLLIN | (select.POLLOUT if conn.out else 0))
+                deadline = min(conn.inflight[0][1] for conn in inflight)
+                try:
+                    with timed(u"daemon wait"):
+                        events = poller.poll(max(0, deadline - time.time()) * 1000)
+                except select.error, e:
+                    if e.args[0] != errno.EINTR:
+                        raise
+                    events = []
+
+                for fd, event in events:
+                    conn = by_fd.get(fd)
+                    if conn is None:
+                        continue
+                    try:
+                        if event & select.POLLOUT:
+                            sent = conn.s.send(conn.out)
+                            conn.out = conn.out[sent:]
+                        if event & (select.POLLIN | select.POLLHUP | select.POLLERR):
+                            data = conn.s.recv(RESPONSE_BUFSIZE)
+                            if not data:
+                                close(conn, DropboxCommand.EOFError())
+                                continue
+                            for reply in conn.parser.feed(data):
+                                done.append((conn.inflight.popleft()[0], reply))
+                    except socket.error, e:
+                        if e.args[0] in (errno.EAGAIN, errno.EINTR):
+                            continue
+                        close(conn, DropboxCommand.BadConnectionError(unicode(e)))
+                    except DropboxCommand.BadConnectionError, e:
+                        close(conn, e)
+
+                now = time.time()
+                for conn in by_fd.values():
+                    if conn.inflight and conn.inflight[0][1] <= now:
+                        close(conn, socket.timeout(u"timed out"))
+
+                for tag, reply in done:
+                    waiting -= 1
+                    yield tag, reply
+                del done[:]
+        finally:
+            for conn in by_fd.values():
+                conn.s.close()
+
+class StatusCache(object):
+    """Daemon replies kept on disk, one small JSON file per command, so
+    repeated polls within `ttl` seconds are answered without talking to
+    the daemon, even from separate invocations of this script. `ttls`
+    overrides the ttl of single commands. Both are given as (environment
+    variable, default) and read on first use. Replies are stored when
+    commit() is called.
+
+    The cache is best effort: a file that can't be read is a miss and a
+    file that can't be written is left as it was.
+    """
+    def __init__(self, path, ttl, ttls=None):
+        self.path = path
+        self.settings = (ttl, ttls or {})
+        self.ttl = None
+        self.ttls = {}
+        # command -> (file identity, {key: [stamp, reply]}) as last read
+        self.loaded = {}
+        # command -> {key: [stamp, reply]} put since the last commit
+        self.queued = {}
+        self.lock = threading.Lock()
+
+    def load_ttls(self):
+        if self.ttl is None:
+            ttl, ttls = self.settings
+            self.ttls = dict((name, env_setting(*setting)) for name, setting in ttls.iteritems())
+            self.ttl = env_setting(*ttl)
+
+    def forget_ttls(self):
+        """Makes the next use read the ttls from the environment again."""
+        self.ttl = None
+
+    def ttl_for(self, name):
+        self.load_ttls()
+        return self.ttls.get(name, self.ttl)
+
+    def file(self, name):
+        return os.path.join(os.path.expanduser(self.path), name + u".json")
+
+    def replies(self, name):
+        """The replies of `name` on disk. The file is only read again
+        once it was replaced, so a resident "serve" sees what other
+        invocations stored or invalidated."""
+        try:
+            st = os.stat(self.file(name))
+        except OSError:
+            self.loaded.pop(name, None)
+            return {}
+        identity = (st.st_ino, st.st_mtime, st.st_size)
+        if name not in self.loaded or self.loaded[name][0] != identity:
+            try:
+                with open(self.file(name), "r") as f:
+                    replies = json.load(f)
+            except (IOError, ValueError):
+                replies = {}
+            self.loaded[name] = (identity, replies if isinstance(replies, dict) else {})
+        return self.loaded[name][1]
+
+    def write(self, name, replies):
+        path = self.file(name)
+        temp = u"%s.%d" % (path, os.getpid())
+        try:
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            with open(temp, "w") as f:
+                json.dump(replies, f)
+            # readers see either the old file or the new one, never half
+            os.rename(temp, path)
+            st = os.stat(path)
+        except (IOError, OSError):
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+            return
+        self.loaded[name] = ((st.st_ino, st.st_mtime, st.st_size), replies)
+
+    def key(self, args):
+        return json.dumps(sorted(args.iteritems()))
+
+    def get(self, name, args):
+        return self.get_many(name, [args])[0]
+
+    def get_many(self, name, args_list):
+        """Returns the cached reply, or None, for each of `args_list`."""
+        ttl = self.ttl_for(name)
+        if ttl <= 0 or not args_list:
+            return [None] * len(args_list)
+        with self.lock, timed(u"status cache"):
+            replies = self.replies(name)
+        oldest = time.time() - ttl
+        found = []
+        for args in args_list:
+            entry = replies.get(self.key(args))
+            found.append(entry[1] if entry is not None and entry[0] > oldest else None)
+        return found
+
+    def put(self, name, args, reply):
+        if self.ttl_for(name) <= 0:
+            return
+        with self.lock:
+            self.queued.setdefault(name, {})[self.key(args)] = [time.time(), reply]
+
+    def commit(self):
+        """Stores the replies put since the last commit, with one write
+        of each command's file, and drops expired ones."""
+        with self.lock, timed(u"status cache"):
+            queued, self.queued = self.queued, {}
+            for name, new in queued.iteritems():
+                oldest = time.time() - self.ttl_for(name)
+                replies = dict((key, entry) for key, entry in self.replies(name).iteritems()
+                               if entry[0] > oldest)
+                replies.update(new)
+                self.write(name, replies)
+
+    def invalidate(self, *names):
+        """Drops the cached replies of the commands in `names`, or of all
+        commands when none are given."""
+        with self.lock:
+            if not names:
+                self.queued.clear()
+                try:
+                    names = [n[:-len(u".json")] for n in os.listdir(os.path.expanduser(self.path))
+                             if n.endswith(u".json")]
+                except OSError:
+                    names = []
+            for name in names:
+                self.queued.pop(name, None)
+                self.loaded.pop(name, None)
+                try:
+                    os.remove(self.file(name))
+                except OSError:
+                    pass
+
+status_cache = StatusCache(STATUS_CACHE_PATH, ("DROPBOX_CACHE_TTL", 0),
+                           {u"icon_overlay_file_status": ("DROPBOX_FILE_CACHE_TTL", 0)})
+
+def cached_command(name, args=None, timeout=5):
+    """Like DropboxCommand.send_command, but answered from status_cache
+    when possible. Only connects to the daemon on a cache miss."""
+    args = args or {}
+    reply = status_cache.get(name, args)
+    if reply is None:
+        with command_pool.connection(timeout) as dc:
+            reply = dc.send_command(name, args)
+        status_cache.put(name, args, reply)
+        status_cache.commit()
+    return reply
+
+def load_scandir():
+    global scandir
+    if scandir is None:
+        try:
+            from os import scandir as module
+        except ImportError:
+            try:
+                from scandir import scandir as module
+            except ImportError:
+                module = False
+        scandir = module
+    return scandir
+
+def iter_listdir(path):
+    """Yields the names in directory `path` without building the whole
+    listing first when a scandir implementation is available."""
+    if not load_scandir():
+        for name in os.listdir(path):
+            yield name
+    else:
+        for entry in scandir(path):
+            yield entry.name
+
+def chunked(iterable, size):
+    """Yields lists of up to `size` items of `iterable`."""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def file_statuses(dc, paths, window=PIPELINE_WINDOW):
+    """Yields (path, reply) for each of `paths`, pipelining the
+    icon_overlay_file_status requests over `dc`. `reply` is None for a
+    path that doesn't exist and a CommandError if the daemon refused it.
+    """
+    # (path, reply) in request order, reply is `waiting` until it arrives
+    pending = collections.deque()
+    waiting = object()
+
+    def requests():
+        for chunk in chunked(paths, STATUS_CACHE_BATCH):
+            replies = status_cache.get_many(u"icon_overlay_file_status",
+                                            [{u"path": path} for path in chunk])
+            for path, reply in zip(chunk, replies):
+                if not os.path.exists(path):
+                    pending.append((path, None))
+                elif reply is None:
+                    pending.append((path, waiting))
+                    yield {u"path": path}
+                else:
+                    pending.append((path, reply))
+
+    try:
+        for reply in dc.pipeline_command(u"icon_overlay_file_status", requests(), window):
+            while True:
+                path, known = pending.popleft()
+                if known is waiting:
+                    if not isinstance(reply, DropboxCommand.CommandError):
+                        status_cache.put(u"icon_overlay_file_status", {u"path": path}, reply)
+                    yield path, reply
+                    break
+                yield path, known
+
+        while pending:
+            yield pending.popleft()
+    finally:
+        status_cache.commit()
+
+commands = {}
+aliases = {}
+
+def command(meth):
+    global commands, aliases
+    assert meth.__doc__, "All commands need properly formatted docstrings (even %r!!)" % meth
+    if hasattr(meth, 'im_func'): # bound method, if we ever have one
+        meth = meth.im_func
+    commands[meth.func_name] = meth
+    meth_aliases = [unicode(alias) for alias in aliases.iterkeys() if aliases[alias].func_name == meth.func_name]
+    if meth_aliases:
+        meth.__doc__ += u"\nAliases: %s" % ",".join(meth_aliases)
+    return meth
+
+def alias(name):
+    def decorator(meth):
+        global commands, aliases
+        assert name not in commands, "This alias is the name of a command."
+        aliases[name] = meth
+        return meth
+    return decorator
+
+def requires_dropbox_running(meth):
+
+    def newmeth(*n, **kw):
+
+    	if not liveness.installed():
+            emit_error(u"Dropbox is not installed!")
+	    return 4
+        elif liveness.running():
+            return meth(*n, **kw)
+        else:
+            emit_error(u"Dropbox isn't running!")
+
+    newmeth.func_name = meth.func_name
+    newmeth.__doc__ = meth.__doc__
+    return newmeth
+
+class DirectoryWatcher(object):
+    """Lets wait() return early when files appear or change in the
+    watched directories. Uses inotify through ctypes, python 2 has no
+    binding for it; where that fails wait() simply sleeps."""
+    IN_MODIFY = 0x2
+    IN_CLOSE_WRITE = 0x8
+    IN_MOVED_TO = 0x80
+    IN_CREATE = 0x100
+    MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+    def __init__(self):
+        self.fd = -1
+        try:
+            self.libc = ctypes.CDLL(None, use_errno=True)
+            self.fd = self.libc.inotify_init1(os.O_NONBLOCK | 02000000) # IN_CLOEXEC
+        except (OSError, AttributeError):
+            pass
+
+    def watch(self, path):
+        if self.fd < 0:
+            return False
+        return self.libc.inotify_add_watch(self.fd, path.encode(sys.getfilesystemencoding()), self.MASK) >= 0
+
+    def wait(self, timeout):
+        if self.fd < 0:
+            time.sleep(timeout)
+            return
+        if select.select([self.fd], [], [], timeout)[0]:
+            # we only care that something happened, drop the events
+            try:
+                while os.read(self.fd, 4096):
+                    pass
+            except OSError:
+                pass
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+def dropbox_answers():
+    try:
+        dc = DropboxCommand(timeout=1)
+    except DropboxCommand.CouldntConnectError:
+        return False
+    try:
+        dc.get_dropbox_status()
+    except DropboxCommand.CommandError:
+        pass
+    except (DropboxCommand.BadConnectionError, DropboxCommand.EOFError, socket.error):
+        return False
+    finally:
+        dc.close()
+    return True
+
+def wait_for_dropbox(timeout, ready=False):
+    """Waits up to `timeout` seconds for the daemon to be running, or
+    with `ready` for its command socket to answer a request. Woken by
+    changes in ~/.dropbox (the pidfile and command_socket live there),
+    with exponential backoff between checks as a safety net."""
+    check = dropbox_answers if ready else is_dropbox_running
+    home = os.path.expanduser(u"~")
+    dropbox_dir = os.path.join(home, u".dropbox")
+
+    watcher = DirectoryWatcher()
+    # ~/.dropbox doesn't exist before the first start, so watch for it
+    watching = watcher.watch(dropbox_dir) or not watcher.watch(home)
+    deadline = time.time() + timeout
+    delay = 0.01
+    try:
+        while True:
+            if check():
+                return True
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return False
+            watcher.wait(min(delay, remaining))
+            delay = min(delay * 2, 1.0)
+            if not watching:
+                watching = watcher.watch(dropbox_dir)
+    finally:
+        watcher.close()
+
+def start_dropbox(wait_ready=False):
+    db_path = os.path.expanduser(u"~/.dropbox-dist/dropboxd").encode(sys.getfilesystemencoding())
+    if os.access(db_path, os.X_OK):
+        f = open("/tmp/_dropbox.out", "w")
+        # dropboxd shares our stderr
+        flush_consoles()
+        # we don't reap the child because we're gonna die anyway, let init do it
+        a = subprocess.Popen([db_path], preexec_fn=os.setsid, cwd=os.path.expanduser("~"),
+                             stderr=sys.stderr, stdout=f, close_fds=True)
+
+        return wait_for_dropbox(60, ready=wait_ready)
+    else:
+        return False
+
+def terminal_width():
+    """Columns of the terminal we're attached to, or None if there isn't
+    one. Asked with an ioctl once per process."""
+    global terminal_columns
+    if terminal_columns is None:
+        terminal_columns = 0
+        # stdin first, like the "stty size" this replaces
+        for f in (sys.stdin, sys.stdout):
+            try:
+                winsize = fcntl.ioctl(f.fileno(), termios.TIOCGWINSZ, "\0" * 8)
+                rows, columns = struct.unpack("HHHH", winsize)[:2]
+            except (AttributeError, ValueError, IOError, OSError, struct.error):
+                continue
+            if columns > 0:
+                terminal_columns = columns
+                break
+    return terminal_columns or None
+
+def column_layout(widths, display_width):
+    """Returns (nrows, colwidths) for laying out items of `widths`
+    column-major in as few rows as fit `display_width`."""
+    size = len(widths)
+
+    # no layout with more columns than this can fit
+    max_cols = (display_width - max(widths)) // (min(widths) + 2) + 1
+    if max_cols < 2:
+        return size, [0]
+
+    # levels[k][i] is the widest of widths[i:i+2**k], so the width of
+    # any column is the wider of two overlapping entries of one level
+    levels = [widths]
+    while 1 << len(levels) <= size:
+        prev, half = levels[-1], 1 << (len(levels) - 1)
+        levels.append(map(max, prev[:len(prev)-half], prev[half:]))
+
+    def fit(nrows):
+        colwidths = []
+        total = -2
+        for start in range(0, size, nrows):
+            end = min(start + nrows, size)
+            k = (end - start).bit_length() - 1
+            level = levels[k]
+            colwidth = max(level[start], level[end - (1 << k)])
+            colwidths.append(colwidth)
+            total += colwidth + 2
+            if total > display_width:
+                return None
+        return colwidths
+
+    # each try costs one step per column, about size/nrows, so trying
+    # every count in turn stays near-linear
+    for nrows in range((size + max_cols - 1) // max_cols, size):
+        colwidths = fit(nrows)
+        if colwidths is not None:
+            return nrows, colwidths
+    return size, [0]
+
+# Extracted and modified from os.cmd.Cmd
+def columnize(list, display_list=None, display_width=None):
+    if not list:
+        console_print(u"<empty>")
+        return
+
+    non_unicode = [i for i in range(len(list)) if not (isinstance(list[i], unicode))]
+    if non_unicode:
+        raise TypeError, ("list[i] not a string for i in %s" %
+                          ", ".join(map(unicode, non_unicode)))
+
+    if not display_width:
+        display_width = terminal_width()
+        if not display_width:
+            for item in list:
+                console_print(item)
+            return
+
+    if not display_list:
+        display_list = list
+
+    size = len(list)
+    if size == 1:
+        console_print(display_list[0])
+        return
+
+    # display_list entries may carry color escapes, so padding is
+    # worked out from the plain names
+    widths = [len(x) for x in list]
+    nrows, colwidths = column_layout(widths, display_width)
+    for row in range(nrows):
+        cells = []
+        for col, i in enumerate(range(row, size, nrows)):
+            cells.append(display_list[i] + u" " * (colwidths[col] - widths[i]))
+        console_print(u"  ".join(cells))
+
+@command
+@requires_dropbox_running
+@alias('stat')
+def filestatus(args):
+    u"""get current sync status of one or more files
+dropbox filestatus [-l] [-a] [-s] [FILE]...
+
+Prints the current status of each FILE. With --format=json or ndjson, entries are output as they arrive, unsorted, like with -s.
+
+options:
+  -l --list    prints out information in a format similar to ls. works best when your console supports color :)
+  -a --all     do not ignore entries starting with .
+  -s --stream  print each entry as soon as its status arrives, unsorted and one per line. use this on huge directories
+"""
+    global enc
+
+    oparser = optparse.OptionParser()
+    oparser.add_option("-l", "--list", action="store_true", dest="list")
+    oparser.add_option("-a", "--all", action="store_true", dest="all")
+    oparser.add_option("-s", "--stream", action="store_true", dest="stream")
+    (options, args) = oparser.parse_args(args)
+    if output is not None:
+        # records carry their own path, no need to sort or align them
+        options.stream = True
+
+    try:
+        with command_pool.connection() as dc:
+            if options.list:
+                # Listing.
+
+                # Separate directories from files.
+                if len(args) == 0:
+                    dirs, nondirs = [u"."], []
+                else:
+                    dirs, nondirs = [], []
+
+                    for a in args:
+                        try:
+                            (dirs if os.path.isdir(a) else nondirs).append(a.decode(enc))
+                        except UnicodeDecodeError:
+                            continue
+
+                    if len(dirs) == 0 and len(nondirs) == 0:
+                        #TODO: why?
+                        exit(1)
+
+                dirs.sort(key=methodcaller('lower'))
+                nondirs.sort(key=methodcaller('lower'))
+
+                supports_color = console(sys.stderr).color
+
+                # Gets a string representation for a path and its status reply.
+                def path_to_string(file_path, reply):
+                    if reply is None:
+                        path = u"%s (File doesn't exist!)" % os.path.basename(file_path)
+                        return (path, path)
+                    if isinstance(reply, DropboxCommand.CommandError):
+                        path =  u"%s (%s)" % (os.path.basename(file_path), reply)
+                        return (path, path)
+                    status = reply.get(u'status', [None])[0]
+
+                    # TODO: Test when you don't support color.
+                    if not supports_color:
+                        path = os.path.basename(file_path)
+                        return (path, path)
+
+                    if status == u"up to date":
+                        init, cleanup = "\x1b[32;1m", "\x1b[0m"
+                    elif status == u"syncing":
+                        init, cleanup = "\x1b[36;1m", "\x1b[0m"
+                    elif status == u"unsyncable":
+                        init, cleanup = "\x1b[41;1m", "\x1b[0m"
+                    elif status == u"selsync":
+                        init, cleanup = "\x1b[37;1m", "\x1b[0m"
+                    else:
+                        init, cleanup = '', ''
+
+                    path = os.path.basename(file_path)
+                    return (path, u"%s%s%s" % (init, path, cleanup))
+
+                # Yields the absolute path of each entry to list in a directory.
+                def directory_paths(name):
+                    for subname in iter_listdir(name):
+                        if type(subname) != unicode:
+                            continue
+
+                        if not options.all and subname[0] == u'.':
+                            continue
+
+                        try:
+                            yield unicode_abspath(os.path.join(name, subname))
+                        except (UnicodeEncodeError, UnicodeDecodeError), e:
+                            continue
+
+                # Prints a directory.
+                def print_directory(name):
+                    if output is not None:
+                        for file_path, reply in file_statuses(dc, directory_paths(name)):
+                            emit(status_record(file_path, reply))
+                        return
+
+                    if options.stream:
+                        empty = True
+                        for file_path, reply in file_statuses(dc, directory_paths(name)):
+                            console_print(path_to_string(file_path, reply)[1])
+                            empty = False
+                        if empty:
+                            console_print(u"<empty>")
+                        return
+
+                    file_paths = sorted(directory_paths(name), key=methodcaller('lower'))
+
+                    clean_paths = []
+                    formatted_paths = []
+                    for file_path, reply in file_statuses(dc, file_paths):
+                        clean, formatted = path_to_string(file_path, reply)
+                        clean_paths.append(clean)
+                        formatted_paths.append(formatted)
+
+                    columnize(clean_paths, formatted_paths)
+
+                try:
+                    if len(dirs) == 1 and len(nondirs) == 0:
+                        print_directory(dirs[0])
+                    else:
+                        nondir_paths = []
+                        for name in nondirs:
+                            try:
+                                nondir_paths.append(unicode_abspath(name))
+                            except (UnicodeEncodeError, UnicodeDecodeError), e:
+                                continue
+
+                        nondir_formatted_paths = []
+                        nondir_clean_paths = []
+                        for file_path, reply in file_statuses(dc, nondir_paths):
+                            if output is not None:
+                                emit(status_record(file_path, reply))
+                                continue
+                            clean, formatted = path_to_string(file_path, reply)
+                            nondir_clean_paths.append(clean)
+                            nondir_formatted_paths.append(formatted)
+
+                        if nondir_clean_paths:
+                            columnize(nondir_clean_paths, nondir_formatted_paths)
+
+                        if len(nondirs) == 0:
+                            if output is None:
+                                console_print(dirs[0] + u":")
+                            print_directory(dirs[0])
+                            dirs = dirs[1:]
+
+                        for name in dirs:
+                            if output is None:
+                                console_print()
+                                console_print(name + u":")
+                            print_directory(name)
+
+                except DropboxCommand.EOFError:
+                    emit_error(u"Dropbox daemon stopped.")
+                except DropboxCommand.BadConnectionError, e:
+                    emit_error(u"Dropbox isn't responding!")
+            else:
+                if len(args) == 0:
+                    args = (name for name in iter_listdir(u".") if type(name) == unicode)
+                    if not options.stream:
+                        args = sorted(args, key=methodcaller('lower'))
+
+                if options.stream:
+                    # no alignment, that would need every name up front
+                    indent = 0
+                elif len(args) == 0:
+                    # Bail early if there's nothing to list to avoid crashing on indent below
+                    console_print(u"<empty>")
+                    return
+                else:
+                    indent = max(len(st)+1 for st in args)
+
+                # files still waiting on their status, in request order
+                files = collections.deque()
+
+                def file_paths():
+                    for file in args:
+
+                        try:
+                            if type(file) is not unicode:
+                                file = file.decode(enc)
+                            fp = unicode_abspath(file)
+                        except (UnicodeEncodeError, UnicodeDecodeError), e:
+                            continue
+                        files.append(file)
+                        yield fp
+
+                for fp, reply in file_statuses(dc, file_paths()):
+                    file = files.popleft()
+                    if output is not None:
+                        emit(status_record(fp, reply))
+                    elif reply is None:
+                        console_print(u"%-*s %s" % \
+                                          (indent, file+':', "File doesn't exist"))
+                    elif isinstance(reply, DropboxCommand.CommandError):
+                        console_print(u"%-*s %s" % (indent, file+':', reply))
+                    else:
+                        status = reply.get(u'status', [u'unknown'])[0]
+                        console_print(u"%-*s %s" % (indent, file+':', status))
+    except DropboxCommand.CouldntConnectError, e:
+        emit_error(u"Dropbox isn't running!")
+
+@command
+@requires_dropbox_running
+def ls(args):
+    u"""list directory contents with current sync status
+dropbox ls [FILE]...
+
+This is an alias for filestatus -l
+"""
+    return filestatus(["-l"] + args)
+
+def ignore_set_chunks(command, paths, chunk_size=IGNORE_CHUNK_SIZE, jobs=4,
+                      retries=IGNORE_CHUNK_RETRIES, timeout=60):
+    """Sends `paths` to the daemon's `command` (ignore_set_add or
+    ignore_set_remove) at most `chunk_size` at a time over up to `jobs`
+    connections, retrying a chunk that fails up to `retries` times.
+
+    Yields (index, chunk, reply, attempts, seconds) for each chunk as it
+    finishes, in no particular order. `reply` is the daemon's reply, or
+    the error of the last attempt if the chunk never went through.
+    """
+    pool = DropboxCommandPool(jobs)
+    chunks = Queue.Queue()
+    results = Queue.Queue()
+    for i in range(0, len(paths), chunk_size):
+        chunks.put((i // chunk_size, paths[i:i + chunk_size]))
+    count = chunks.qsize()
+
+    def worker():
+        while True:
+            try:
+                i, chunk = chunks.get_nowait()
+            except Queue.Empty:
+                return
+            attempts = 0
+            start = time.time()
+            while True:
+                attempts += 1
+                try:
+                    with pool.connection(timeout) as dc:
+                        reply = dc.send_command(command, {u"paths": chunk})
+                    break
+                except DropboxCommand.CommandError, e:
+                    # the daemon turned it down, asking again won't help
+                    reply = e
+                    break
+                except (DropboxCommand.CouldntConnectError, DropboxCommand.BadConnectionError,
+                        DropboxCommand.EOFError, socket.error), e:
+                    reply = e
+                    if attempts > retries:
+                        break
+                    time.sleep(min(0.25 * 2 ** attempts, 5))
+            results.put((i, chunk, reply, attempts, time.time() - start))
+
+    workers = [threading.Thread(target=worker) for i in range(min(jobs, count))]
+    for t in workers:
+        t.daemon = True
+        t.start()
+
+    try:
+        for n in range(count):
+            # get() with no timeout can't be interrupted with ^C
+            while True:
+                try:
+                    yield results.get(True, 0.25)
+                    break
+                except Queue.Empty:
+                    pass
+    finally:
+        pool.close()
+
+def status_record(path, reply):
+    """The --format record for a file_statuses() result."""
+    if reply is None:
+        return {u"path": path, u"error": u"File doesn't exist"}
+    if isinstance(reply, DropboxCommand.CommandError):
+        return {u"path": path, u"error": unicode(reply)}
+    return {u"path": path, u"status": reply.get(u'status', [u'unknown'])[0]}
+
+def walk_paths(top, all=False):
+    """Yields the path of every entry below directory `top`, a
+    directory at a time, skipping dot entries unless `all` is set."""
+    for root, dirs, files in os.walk(top):
+        dirs[:] = [d for d in dirs if type(d) == unicode and (all or d[0] != u'.')]
+        for name in dirs:
+            yield os.path.join(root, name)
+        for name in files:
+            if type(name) == unicode and (all or name[0] != u'.'):
+                yield os.path.join(root, name)
+
+@command
+@requires_dropbox_running
+def tree(argv):
+    u"""get sync status of everything under a directory
+dropbox tree [-a] [-j JOBS] [-s STATUS]... [DIRECTORY]
+
+Walks DIRECTORY (the current directory by default) recursively, prints each entry whose status is one of STATUS or couldn't be queried (with the reason), then prints how many entries have each status.
+
+options:
+  -a --all     do not ignore entries starting with .
+  -j --jobs    number of daemon connections to query in parallel (default 4)
+  -s --status  status to print paths for, can be repeated (default unsyncable and syncing)
+"""
+    oparser = optparse.OptionParser()
+    oparser.add_option("-a", "--all", action="store_true", dest="all")
+    oparser.add_option("-j", "--jobs", type="int", dest="jobs", default=4)
+    oparser.add_option("-s", "--status", action="append", dest="status")
+    (options, args) = oparser.parse_args(argv)
+
+    if len(args) > 1 or options.jobs < 1:
+        print_usage(tree)
+        return
+
+    try:
+        top = args[0].decode(enc) if args else u"."
+        top = unicode_abspath(top)
+    except (UnicodeEncodeError, UnicodeDecodeError), e:
+        emit_error(u"Couldn't decode path: %s" % e)
+        return
+    if not os.path.isdir(top):
+        emit_error(u"%s is not a directory" % top)
+        return
+
+    report = set(s.decode(enc) for s in options.status) if options.status else \
+             set([u"unsyncable", u"syncing"])
+    counts = {}
+    found = 0
+    # cached statuses skip the daemon, the loop below picks them up
+    hits = collections.deque()
+
+    def requests():
+        for chunk in chunked(walk_paths(top, options.all), STATUS_CACHE_BATCH):
+            replies = status_cache.get_many(u"icon_overlay_file_status",
+                                            [{u"path": path} for path in chunk])
+            for path, reply in zip(chunk, replies):
+                if reply is None:
+                    yield path, u"icon_overlay_file_status", {u"path": path}
+                else:
+                    hits.append((path, reply))
+
+    def results(multiplexer):
+        for path, reply in multiplexer.run(requests()):
+            if isinstance(reply, dict):
+                status_cache.put(u"icon_overlay_file_status", {u"path": path}, reply)
+            while hits:
+                yield hits.popleft()
+            yield path, reply
+        while hits:
+            yield hits.popleft()
+
+    try:
+        for path, reply in results(CommandMultiplexer(connections=options.jobs)):
+            if isinstance(reply, dict):
+                status = reply.get(u'status', [u'unknown'])[0]
+                error = None
+            else:
+                status = u"error"
+                error = daemon_error(reply)
+            counts[status] = counts.get(status, 0) + 1
+            if error is not None:
+                found += 1
+                emit({u"path": path, u"status": status, u"error": error},
+                     u"error: %s: %s" % (path, error))
+            elif status in report:
+                found += 1
+                emit({u"path": path, u"status": status}, u"%s: %s" % (status, path))
+    finally:
+        status_cache.commit()
+
+    lines = [u"%s: %d" % (status, counts[status]) for status in sorted(counts)]
+    if found:
+        lines.insert(0, u"")
+    emit({u"counts": counts}, u"\n".join(lines) if lines else None)
+    return 1 if found else 0
+
+@command
+@requires_dropbox_running
+def puburl(args):
+    u"""get public url of a file in your dropbox
+dropbox puburl FILE
+
+Prints out a public url for FILE.
+"""
+    if len(args) != 1:
+        print_usage(puburl)
+        return
+
+    try:
+        with command_pool.connection() as dc:
+            try:
+                path = unicode_abspath(args[0].decode(sys.getfilesystemencoding()))
+                link = dc.get_public_link(path=path).get(u'link', [u'No Link'])[0]
+                emit({u"path": path, u"link": link}, link)
+            except DropboxCommand.CommandError, e:
+                emit_error(u"Couldn't get public url: " + str(e))
+            except DropboxCommand.BadConnectionError, e:
+                emit_error(u"Dropbox isn't responding!")
+            except DropboxCommand.EOFError:
+                emit_error(u"Dropbox daemon stopped.")
+    except DropboxCommand.CouldntConnectError, e:
+        emit_error(u"Dropbox isn't running!")
+
+@command
+@requires_dropbox_running
+def link(args):
+    u"""get waiting for activation link of the dropboxd
+dropbox link
+
+Prints out the activation link of the Dropbox daemon.
+"""
+
+    status = open("/tmp/_dropbox.out", "r").readlines()[0:2]
+    if len(status) > 0:
+        link = "".join(status).rstrip("\n")
+        record = {u"link": link.decode("utf8", "replace")}
+        urls = [word for word in record[u"link"].split() if word.startswith(u"https://")]
+        if urls:
+            record[u"url"] = urls[0]
+        emit(record, u"%s" % link)
+        return 5
+    else:
+	emit_error(u"Auth link not found.")
+        return 4
+
+def status_option_parser():
+    oparser = optparse.OptionParser()
+    oparser.add_option("-w", "--watch", action="store_true", dest="watch")
+    oparser.add_option("-c", "--count", type="int", dest="count", default=0)
+    oparser.add_option("-i", "--interval", type="float", dest="interval", default=1)
+    oparser.add_option("-m", "--max-interval", type="float", dest="max_interval", default=30)
+    return oparser
+
+@command
+@requires_dropbox_running
+def status(args):
+    u"""get current status of the dropboxd
+dropbox status [-w] [-c COUNT] [-i SECONDS] [-m SECONDS]
+
+Prints out the current status of the Dropbox daemon.
+
+options:
+  -w --watch         keep running and print the status again each time it changes. the daemon is asked every SECONDS while it is busy, and less and less often while it stays idle
+  -c --count         with --watch, exit after printing the status this many times. --count 2 waits for the next change
+  -i --interval      seconds between checks while busy (default 1)
+  -m --max-interval  seconds between checks once idle for a while (default 30)
+"""
+    if len(args) != 0:
+        (options, args) = status_option_parser().parse_args(args)
+
+        if args or not options.watch or options.interval <= 0:
+            print_usage(status)
+            return
+        return watch_status(options.interval, max(options.interval, options.max_interval), options.count)
+
+    try:
+        lines = cached_command(u"get_dropbox_status")[u'status']
+        if len(lines) == 0:
+            emit({u"status": u"Idle"}, u'Idle')
+        else:
+            for line in lines:
+                emit({u"status": line}, line)
+                if line.startswith(u"Waiting to be link"):
+                    return 3
+        return 1
+    except KeyError:
+        emit_error(u"Couldn't get status: daemon isn't responding")
+    except DropboxCommand.CommandError, e:
+        emit_error(u"Couldn't get status: " + str(e))
+    except DropboxCommand.BadConnectionError, e:
+        emit_error(u"Dropbox isn't responding!")
+    except DropboxCommand.EOFError:
+        emit_error(u"Dropbox daemon stopped.")
+    except DropboxCommand.CouldntConnectError, e:
+        emit_error(u"Dropbox isn't running!")
+    return 0
+
+IDLE_STATUSES = (u"Up to date", u"Idle")
+
+def watch_status(interval, max_interval, count=0):
+    """Polls the daemon's status over one connection, printing it when it
+    changes, until `count` statuses have been printed or ^C. Checks every
+    `interval` seconds while the daemon is busy or just changed, backing
+    off towards `max_interval` while it stays idle."""
+    dc = None
+    last = None
+    printed = 0
+    wait = interval
+    code = 0
+    try:
+        while True:
+            error = None
+            try:
+                if dc is None:
+                    dc = DropboxCommand()
+                lines = dc.get_dropbox_status()[u'status'] or [u"Idle"]
+                code = 3 if any(line.startswith(u"Waiting to be link") for line in lines) else 1
+            except KeyError:
+                error = u"Couldn't get status: daemon isn't responding"
+            except DropboxCommand.CommandError, e:
+                error = u"Couldn't get status: " + unicode(e)
+            except (DropboxCommand.CouldntConnectError, DropboxCommand.BadConnectionError,
+                    DropboxCommand.EOFError, socket.error), e:
+                error = u"Dropbox isn't running!" \
+                        if isinstance(e, DropboxCommand.CouldntConnectError) else \
+                        u"Dropbox isn't responding!"
+                if dc is not None:
+                    dc.close()
+                    dc = None
+            if error is not None:
+                lines = [error]
+                code = 0
+
+            if lines != last:
+                for line in lines:
+                    if error is None:
+                        emit({u"status": line}, line)
+                    else:
+                        emit_error(line)
+                console_flush()
+                last = lines
+                printed += 1
+                if count and printed >= count:
+                    return code
+                wait = interval
+            elif error is None and lines[0] not in IDLE_STATUSES:
+                wait = interval
+            else:
+                wait = min(wait * 2, max_interval)
+            time.sleep(wait)
+    except KeyboardInterrupt:
+        return code
+    finally:
+        if dc is not None:
+            dc.close()
+
+@command
+def running(argv):
+    u"""return whether dropbox is running
+dropbox running
+
+Returns 1 if running 0 if not running.
+"""
+    running = is_dropbox_running()
+    emit({u"running": running})
+    return int(running)
+
+@command
+def installed(argv = ()):
+    u"""return whether dropbox is installed
+dropbox installed
+
+Returns 1 if installed 0 if not installed.
+"""
+    installed = liveness.installed()
+    emit({u"installed": installed})
+    return int(installed)
+
+@command
+def health(argv):
+    u"""check that dropboxd is installed, running and responding
+dropbox health [-t SECONDS]
+
+Prints whether the daemon is installed, whether its pidfile names a running dropboxd and whether its command socket accepts connections. Nothing is asked of the daemon, so this is cheap enough to poll.
+
+Returns 1 if all three hold 0 if not, like running and installed.
+
+options:
+  -t --timeout SECONDS  how long to wait for the command socket to accept a connection (default 1)
+"""
+    oparser = optparse.OptionParser()
+    oparser.add_option("-t", "--timeout", type="float", dest="timeout", default=1)
+    (options, args) = oparser.parse_args(argv)
+
+    installed = liveness.installed()
+    running = liveness.running()
+    responding = liveness.responding(options.timeout)
+    record = {u"installed": installed, u"running": running, u"responding": responding}
+    if running:
+        record[u"pid"] = liveness.pid
+
+    emit(record, u"installed: %s\nrunning: %s\nresponding: %s" %
+         (u"yes" if installed else u"no",
+          u"yes (pid %d)" % liveness.pid if running else u"no",
+          u"yes" if responding else u"no"))
+
+    return int(installed and running and responding)
+
+@command
+@requires_dropbox_running
+def stop(args):
+    u"""stop dropboxd
+dropbox stop
+
+Stops the dropbox daemon.
+"""
+    try:
+        with command_pool.connection() as dc:
+            try:
+                dc.tray_action_hard_exit()
+            except DropboxCommand.BadConnectionError, e:
+                console_print(u"Dropbox isn't responding!")
+            except DropboxCommand.EOFError:
+                console_print(u"Dropbox daemon stopped.")
+            finally:
+                open("/tmp/_dropbox.out", "w").write("")
+                status_cache.invalidate()
+    except DropboxCommand.CouldntConnectError, e:
+        console_print(u"Dropbox isn't running!")
+
+#returns true if link is necessary
+def grab_link_url_if_necessary():
+    try:
+        with command_pool.connection() as dc:
+            try:
+                link_url = dc.needs_link().get(u"link_url", None)
+                if link_url is not None:
+                    console_print(u"To link this computer to a dropbox account, visit the following url:\n%s" % link_url[0])
+                    return True
+                else:
+                    return False
+            except DropboxCommand.CommandError, e:
+                pass
+            except DropboxCommand.BadConnectionError, e:
+                console_print(u"Dropbox isn't responding!")
+            except DropboxCommand.EOFError:
+                console_print(u"Dropbox daemon stopped.")
+    except DropboxCommand.CouldntConnectError, e:
+        console_print(u"Dropbox isn't running!")
+
+@command
+@requires_dropbox_running
+def lansync(argv):
+    u"""enables or disables LAN sync
+dropbox lansync [y/n]
+
+options:
+  y  dropbox will use LAN sync (default)
+  n  dropbox will not use LAN sync
+"""
+    if len(argv) != 1:
+        print_usage(lansync)
+        return
+
+    s = argv[0].lower()
+    if s.startswith('y') or s.startswith('-y'):
+        should_lansync = True
+    elif s.startswith('n') or s.startswith('-n'):
+        should_lansync = False
+    else:
+        should_lansync = None
+
+    if should_lansync is None:
+        print_usage(lansync)
+    else:
+        with command_pool.connection() as dc:
+            dc.set_lan_sync(lansync='enabled' if should_lansync else 'disabled')
+
+
+@command
+@requires_dropbox_running
+def exclude(args):
+    u"""ignores/excludes a directory from syncing
+dropbox exclude [list]
+dropbox exclude add [OPTION]... [DIRECTORY], [DIRECTORY] ...
+dropbox exclude remove [OPTION]... [DIRECTORY], [DIRECTORY] ...
+dropbox exclude sync [OPTION]... [-k NAME]... [DIRECTORY]
+
+"list" prints a list of directories currently excluded from syncing.
+"add" adds one or more directories to the exclusion list, then resynchronizes Dropbox.
+"remove" removes one or more directories from the exclusion list, then resynchronizes Dropbox.
+"sync" excludes every entry of DIRECTORY (default ~/Dropbox) not starting with . except the ones named with -k/--keep, which are made to sync again if they were excluded. Only the changes are sent to Dropbox, so running it again does nothing.
+With no arguments, executes "list".
+Any specified path must be within Dropbox.
+
+options for add, remove and sync:
+  -j --jobs        number of daemon connections to send paths over in parallel (default 4)
+  -c --chunk-size  paths per request (default 256), a failed request is retried on its own
+  -t --timeout     seconds to wait for each request (default 60)
+  -v --verbose     print the size, attempts and latency of each request to stderr
+
+For add and remove, options go before the directories. Everything from the first argument that isn't one of these options, or after --, is taken as a directory.
+"""
+    if len(args) == 0:
+        try:
+            reply = status_cache.get(u"get_ignore_set", {})
+            if reply is None and output is not None:
+                # straight from the daemon to the output, unsorted
+                count = 0
+                with command_pool.connection() as dc:
+                    for path in ignore_set_paths(dc):
+                        emit({u"path": path, u"excluded": True})
+                        count += 1
+                return 7 if count else 6
+            if reply is None:
+                with command_pool.connection() as dc:
+                    paths = list(ignore_set_paths(dc))
+                status_cache.put(u"get_ignore_set", {}, {u"ignore_set": paths})
+                status_cache.commit()
+            else:
+                paths = reply[u'ignore_set']
+            if output is not None:
+                for path in paths:
+                    emit({u"path": path, u"excluded": True})
+                return 7 if paths else 6
+            lines = sorted(relpath(path) for path in paths)
+            if len(lines) == 0:
+                return 6
+            else:
+                for line in lines:
+                    console_print(unicode(line))
+                return 7
+        except KeyError:
+            emit_error(u"Couldn't get ignore set: daemon isn't responding")
+        except DropboxCommand.CommandError, e:
+            if e.args[0].startswith(u"No command exists by that name"):
+                emit_error(u"This version of the client does not support this command.")
+            else:
+                emit_error(u"Couldn't get ignore set: " + str(e))
+        except DropboxCommand.BadConnectionError, e:
+            emit_error(u"Dropbox isn't responding!")
+        except DropboxCommand.EOFError:
+            emit_error(u"Dropbox daemon stopped.")
+        except DropboxCommand.CouldntConnectError, e:
+            emit_error(u"Dropbox isn't running!")
+    elif len(args) == 1 and args[0] == u"list":
+        return exclude([])
+    elif len(args) >= 1 and args[0] == u"sync":
+        return exclude_sync(args[1:])
+    elif len(args) >= 2 and args[0] in (u"add", u"remove"):
+        sub_command = args[0]
+        oparser = ignore_set_options()
+        option_args, paths = split_options(oparser, args[1:])
+        (options, extra) = oparser.parse_args(option_args)
+        paths = extra + paths
+        if not paths or options.jobs < 1 or options.chunk_size < 1:
+            print_usage(exclude)
+            return
+        absolute_paths = []
+
+        for path in paths:
+          # Dropbox python script cant read paths with spaces in
+          # it becuase of how it parses arguments from cli.
+          # This replaces -- with spaces in an effort to not modify 
+          # the rest of the script to fix the bug.
+          path = path.replace("--", " ")
+          absolute_paths.append(unicode_abspath(path.decode(sys.getfilesystemencoding())))
+
+        # the ignore set and the status of everything below it change
+        status_cache.invalidate()
+
+        command = u"ignore_set_add" if sub_command == u"add" else u"ignore_set_remove"
+        changed, failed = send_ignore_set(command, absolute_paths, options)
+        if changed and not failed:
+            return 8
+    else:
+        print_usage(exclude)
+        return
+
+def ignore_set_paths(dc):
+    """Yields the paths in the daemon's ignore set as they are read."""
+    for key, value in dc.stream_command(u"get_ignore_set", {}):
+        if key == u"ignore_set" and value is not None:
+            yield value
+
+def ignore_set_options():
+    oparser = optparse.OptionParser()
+    oparser.add_option("-j", "--jobs", type="int", dest="jobs", default=4)
+    oparser.add_option("-c", "--chunk-size", type="int", dest="chunk_size", default=IGNORE_CHUNK_SIZE)
+    oparser.add_option("-t", "--timeout", type="float", dest="timeout", default=60)
+    oparser.add_option("-v", "--verbose", action="store_true", dest="verbose")
+    return oparser
+
+def split_options(oparser, args):
+    """Splits `args` into the leading options `oparser` knows and what
+    follows. exclude paths can start with "--", spaces are passed that
+    way, so anything else ends the options, as does "--" itself."""
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg == "--":
+            return args[:i], args[i+1:]
+        if not arg.startswith("-"):
+            break
+        name = arg.split("=", 1)[0] if arg.startswith("--") else arg[:2]
+        if not oparser.has_option(name):
+            break
+        i += 1
+        # "--jobs 4" and "-j 4" take the next argument as their value
+        if arg == name and oparser.get_option(name).takes_value():
+            i += 1
+    return args[:i], args[i:]
+
+def daemon_error(e):
+    if isinstance(e, KeyError):
+        return u"daemon isn't responding"
+    elif isinstance(e, DropboxCommand.CommandError):
+        if e.args[0].startswith(u"No command exists by that name"):
+            return u"this version of the client does not support this command"
+        return unicode(e)
+    elif isinstance(e, DropboxCommand.CouldntConnectError):
+        return u"Dropbox isn't running!"
+    elif isinstance(e, DropboxCommand.EOFError):
+        return u"Dropbox daemon stopped."
+    elif isinstance(e, socket.timeout) or not e.args:
+        return u"Dropbox isn't responding!"
+    return u"Dropbox isn't responding! [%s]" % e
+
+def send_ignore_set(command, paths, options):
+    """Sends `paths` with ignore_set_chunks() and prints what the daemon
+    changed as the replies come in. Returns (changed, failed), the
+    number of paths the daemon reported changed and of paths in chunks
+    that never went through."""
+    key, header = {u"ignore_set_add": (u"ignored", u"Excluded: "),
+                   u"ignore_set_remove": (u"removed", u"No longer excluded: ")}[command]
+    total = (len(paths) + options.chunk_size - 1) // options.chunk_size
+    changed = failed = 0
+
+    for i, chunk, reply, attempts, elapsed in ignore_set_chunks(
+            command, paths, options.chunk_size, options.jobs, timeout=options.timeout):
+        if isinstance(reply, Exception):
+            failed += len(chunk)
+            message = u"Couldn't send request %d/%d (%d paths) after %d attempts: %s" % \
+                      (i + 1, total, len(chunk), attempts, daemon_error(reply))
+            emit({u"error": message, u"paths": chunk}, message)
+            continue
+        if options.verbose:
+            console_print(u"request %d/%d: %d paths, %d changed, %d attempts, %.1fms" %
+                          (i + 1, total, len(chunk), len(reply.get(key, [])), attempts, elapsed * 1000),
+                          f=sys.stderr)
+        for path in reply.get(key, []):
+            if not changed and output is None:
+                console_print(header)
+            changed += 1
+            emit({u"path": path, u"excluded": key == u"ignored"}, unicode(relpath(path)))
+    return changed, failed
+
+def exclude_delta(root, keep, ignore_set):
+    """Returns (add, remove): the entries of `root` that should be added
+    to `ignore_set` and the kept ones that should be taken out of it."""
+    # the daemon may hand the ignore set back lowercased
+    ignored = set(path.lower() for path in ignore_set)
+    add, remove = [], []
+    for name in iter_listdir(root):
+        if name.startswith(u"."):
+            # .dropbox, .dropbox.cache and friends belong to the daemon
+            continue
+        path = os.path.join(root, name)
+        if name in keep:
+            if path.lower() in ignored:
+                remove.append(path)
+        elif path.lower() not in ignored:
+            add.append(path)
+    add.sort()
+    remove.sort()
+    return add, remove
+
+def exclude_sync(args):
+    oparser = ignore_set_options()
+    oparser.add_option("-k", "--keep", action="append", dest="keep", default=[])
+    (options, args) = oparser.parse_args(args)
+
+    if len(args) > 1 or options.jobs < 1 or options.chunk_size < 1:
+        print_usage(exclude)
+        return
+
+    enc = sys.getfilesystemencoding()
+    root = unicode_abspath(args[0].decode(enc) if args else os.path.expanduser(u"~/Dropbox"))
+    keep = set(name.decode(enc) for name in options.keep)
+
+    try:
+        with command_pool.connection(options.timeout) as dc:
+            add, remove = exclude_delta(root, keep, ignore_set_paths(dc))
+    except OSError, e:
+        emit_error(u"Couldn't list %s: %s" % (root, e.strerror))
+        return
+    except (KeyError, DropboxCommand.CommandError, DropboxCommand.CouldntConnectError,
+            DropboxCommand.BadConnectionError, DropboxCommand.EOFError, socket.error), e:
+        emit_error(u"Couldn't get ignore set: " + daemon_error(e))
+        return
+
+    if not add and not remove:
+        return
+
+    status_cache.invalidate()
+    changed, failed = send_ignore_set(u"ignore_set_add", add, options)
+    removed, failed_remove = send_ignore_set(u"ignore_set_remove", remove, options)
+    if (changed or removed) and not (failed or failed_remove):
+        return 8
+
+@command
+def install(argv):
+    u"""install dropboxd
+dropbox install
+
+Installs the dropbox daemon, dropboxd. If dropboxd is already installed, this will do nothing.
+
+Set DROPBOX_MIRROR to a directory or URL holding dropbox-lnx.PLAT.tar.gz and its .sig to install from there instead of dropbox.com. Verified archives are kept in DROPBOX_DIST_CACHE (default ~/.dropbox-app/dist-cache, at most DROPBOX_DIST_CACHE_SIZE megabytes) and reused by later installs of the same release.
+"""
+    if installed() != 1:
+        # install dropbox!!!
+        try:
+            download(writeLog = True)
+        except:
+            traceback.print_exc()
+	else:
+            console_print(u"Done!")
+	    return 1
+    else:
+	console_print(u"Already installed, skipping.")
+	return 1
+
+@command
+def start(argv):
+    u"""start dropboxd
+dropbox start [-i] [-w]
+
+Starts the dropbox daemon, dropboxd. If dropboxd is already running, this will do nothing.
+
+options:
+  -i --install     auto install dropboxd if not available on the system
+  -w --wait-ready  don't return until dropboxd answers on its command socket
+"""
+
+    should_install = "-i" in argv or "--install" in argv
+    wait_ready = "-w" in argv or "--wait-ready" in argv
+
+    # first check if dropbox is already running
+    if is_dropbox_running():
+        if wait_ready:
+            wait_for_dropbox(60, ready=True)
+        if not grab_link_url_if_necessary():
+            console_print(u"Dropbox is already running!")
+        return
+
+    console_print(u"Starting Dropbox...", linebreak=False)
+    console_flush()
+    if not start_dropbox(wait_ready):
+        if not should_install:
+            console_print()
+            console_print(u"The Dropbox daemon is not installed!")
+            console_print(u"Run \"dropbox start -i\" to install the daemon")
+            return
+
+        # install dropbox!!!
+        try:
+            download()
+        except:
+            traceback.print_exc()
+        else:
+            if start_dropbox(wait_ready):
+                if not grab_link_url_if_necessary():
+                    console_print(u"Done!")
+    else:
+        if not grab_link_url_if_necessary():
+            console_print(u"Done!")
+
+
+def can_reroll_autostart():
+    return u".config" in os.listdir(os.path.expanduser(u'~'))
+
+def reroll_autostart(should_autostart):
+    home_dir = os.path.expanduser(u'~')
+    contents = os.listdir(home_dir)
+
+    # UBUNTU
+    if u".config" in contents:
+        autostart_dir = os.path.join(home_dir, u".config", u"autostart")
+        autostart_link = os.path.join(autostart_dir, u"dropbox.desktop")
+        if should_autostart:
+            if os.path.exists(DESKTOP_FILE):
+                if not os.path.exists(autostart_dir):
+                    os.makedirs(autostart_dir)
+                shutil.copyfile(DESKTOP_FILE, autostart_link)
+        elif os.path.exists(autostart_link):
+            os.remove(autostart_link)
+
+
+
+@command
+def autostart(argv):
+    u"""automatically start dropbox at login
+dropbox autostart [y/n]
+
+options:
+  n  dropbox will not start automatically at login
+  y  dropbox will start automatically at login (default)
+
+Note: May only work on current Ubuntu distributions.
+"""
+    if len(argv) != 1:
+        console_print(''.join(autostart.__doc__.split('\n', 1)[1:]).decode('ascii'))
+        return
+
+    s = argv[0].lower()
+    if s.startswith('y') or s.startswith('-y'):
+        should_autostart = True
+    elif s.startswith('n') or s.startswith('-n'):
+        should_autostart = False
+    else:
+        should_autostart = None
+
+    if should_autostart is None:
+        print_usage(autostart)
+    else:
+        reroll_autostart(should_autostart)
+
+def run_batched(name, args):
+    """Runs one command of a batch. A command that fails, even with an
+    exception or by exiting, is reported and returns 1 (or its exit
+    code) rather than ending the batch."""
+    try:
+        return run_command(name, args)
+    except SystemExit, e:
+        return e.code
+    except Exception:
+        console_flush()
+        traceback.print_exc()
+        return 1
+
+@command
+def batch(argv):
+    u"""run many commands over shared daemon connections
+dropbox batch [-e] [FILE]
+
+Reads one command per line from FILE (or standard input when FILE is omitted or -) and runs them in order. Connections to the Dropbox daemon are kept open between commands, so this is much cheaper than running the script once per command. A line that can't be parsed, or a command that fails, is reported on stderr and the batch goes on with the next line.
+
+options:
+  -e --exit-codes  print "# exit N" after each command with its return value
+"""
+    oparser = optparse.OptionParser()
+    oparser.add_option("-e", "--exit-codes", action="store_true", dest="exit_codes")
+    (options, args) = oparser.parse_args(argv)
+
+    if len(args) > 1:
+        print_usage(batch)
+        return
+
+    f = sys.stdin if not args or args[0] == "-" else open(args[0], "r")
+    result = None
+    try:
+        for number, line in enumerate(iter(f.readline, ""), 1):
+            try:
+                words = shlex.split(line, comments=True)
+            except ValueError, e:
+                console_print(u"line %d: %s" % (number, e), f=sys.stderr)
+                result = 1
+            else:
+                if not words:
+                    continue
+                if words[0] == "batch" or (words[0] not in commands and words[0] not in aliases):
+                    console_print(u"unknown command '%s'" % words[0].decode(enc), f=sys.stderr)
+                    result = None
+                else:
+                    result = run_batched(words[0], words[1:])
+            if options.exit_codes:
+                console_print(u"# exit %s" % (0 if result is None else result))
+            console_flush()
+    finally:
+        if f is not sys.stdin:
+            f.close()
+        command_pool.close()
+    return result
+
+# commands that are safe to run inside serve: no stdin, no child
+# processes inheriting our stdio, nothing that outlives the request
+SERVED_COMMANDS = set(["status", "filestatus", "stat", "ls", "tree", "exclude",
+                       "puburl", "link", "running", "installed", "health"])
+
+class FrameWriter(object):
+    """File-like object that sends everything written to it to a serve
+    client as "<stream> <length>" framed chunks."""
+    def __init__(self, f, stream):
+        self.f = f
+        self.stream = stream
+
+    def write(self, data):
+        if isinstance(data, unicode):
+            data = data.encode(enc)
+        if data:
+            self.f.write("%s %d\n%s" % (self.stream, len(data), data))
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def flush(self):
+        self.f.flush()
+
+    def isatty(self):
+        return False
+
+def watches_status(args):
+    """Whether `args`, given to the status command, make it watch. The
+    status parser itself decides, so abbreviations like --wa count."""
+    oparser = status_option_parser()
+    def error(msg):
+        raise ValueError(msg)
+    oparser.error = error
+    try:
+        (options, args) = oparser.parse_args(args)
+    except ValueError:
+        # bad options, which status run by the shim reports better
+        return True
+    return bool(options.watch)
+
+@contextmanager
+def caller_settings(env):
+    """Runs its block with the DROPBOX_* environment variables of a serve
+    client, `env`, in place of the helper's own."""
+    def replace(settings):
+        for name in [name for name in os.environ if name.startswith("DROPBOX_")]:
+            del os.environ[name]
+        os.environ.update(settings)
+        status_cache.forget_ttls()
+
+    own = dict((name, value) for name, value in os.environ.iteritems() if name.startswith("DROPBOX_"))
+    replace(env)
+    try:
+        yield
+    finally:
+        replace(own)
+
+def serve_request(conn):
+    f = conn.makefile("r+", 4096)
+    try:
+        # a client that connects and then says nothing mustn't hold up
+        # the others for longer than this
+        conn.settimeout(SERVE_REQUEST_TIMEOUT)
+        request = json.loads(f.readline())
+        args = [arg.encode("utf8") for arg in request[u"argv"]]
+        cut = find_command(args)
+        if cut is None or args[cut] not in SERVED_COMMANDS or \
+           (args[cut] == "status" and watches_status(args[cut+1:])):
+            # let the shim run this one itself; "status --watch" never
+            # ends and would hold up every other client
+            f.write("r 0\n")
+            return
+        conn.settimeout(None)
+
+        cwd = os.getcwd()
+        stdout, stderr = sys.stdout, sys.stderr
+        sys.stdout, sys.stderr = FrameWriter(f, "1"), FrameWriter(f, "2")
+        env = dict((name.encode("utf8"), value.encode("utf8"))
+                   for name, value in request.get(u"env", {}).iteritems())
+        try:
+            os.chdir(request[u"cwd"])
+            with caller_settings(env):
+                result = dispatch(args, cut)
+        except SystemExit, e:
+            result = e.code
+        except Exception:
+            traceback.print_exc()
+            result = 1
+        finally:
+            for stream in (sys.stdout, sys.stderr):
+                c = consoles.pop(stream, None)
+                if c is not None:
+                    c.flush()
+            sys.stdout, sys.stderr = stdout, stderr
+            os.chdir(cwd)
+
+        f.write("x %d\n" % (result if isinstance(result, int) else 0))
+    finally:
+        try:
+            f.close()
+        except socket.error:
+            pass
+        conn.close()
+
+@command
+def serve(argv):
+    u"""keep a resident helper running for fast repeated commands
+dropbox serve [-d] [-t SECONDS]
+
+Stays running and answers the commands dropbox-shim.py forwards to it on ~/.dropbox-app/helper_socket. Daemon connections, the status cache and everything this script imports are kept warm between commands. Commands are run one at a time. Each command sees the DROPBOX_* environment variables of the shim that forwarded it, such as DROPBOX_CACHE_TTL and DROPBOX_STATS_FILE. Does nothing if a helper is already listening.
+
+options:
+  -d --daemon   detach and keep running in the background
+  -t --timeout  exit after this many seconds without a command (default 3600, 0 means never)
+"""
+    oparser = optparse.OptionParser()
+    oparser.add_option("-d", "--daemon", action="store_true", dest="daemon")
+    oparser.add_option("-t", "--timeout", type="float", dest="timeout", default=3600)
+    (options, args) = oparser.parse_args(argv)
+
+    path = os.path.expanduser(HELPER_SOCKET)
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        s.connect(path)
+    except socket.error:
+        pass
+    else:
+        s.close()
+        return
+    s.close()
+
+    if options.daemon:
+        null = open(os.devnull, "r+")
+        subprocess.Popen([sys.executable, DROPBOX_PY, "serve", "-t", str(options.timeout)],
+                         preexec_fn=os.setsid, cwd=os.path.expanduser("~"),
+                         stdin=null, stdout=null, stderr=null, close_fds=True)
+        return
+
+    if os.path.exists(path):
+        # left behind by a helper that didn't exit cleanly
+        os.remove(path)
+    elif not os.path.isdir(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0077)
+    try:
+        s.bind(path)
+    finally:
+        os.umask(old_umask)
+    s.listen(16)
+    s.settimeout(options.timeout or None)
+
+    try:
+        while True:
+            try:
+                conn, _ = s.accept()
+            except socket.timeout:
+                break
+            try:
+                serve_request(conn)
+            except (socket.error, ValueError, KeyError), e:
+                # client went away or sent garbage, it only affects them
+                continue
+    finally:
+        s.close()
+        os.remove(path)
+        command_pool.close()
+
+@command
+def help(argv):
+    u"""provide help
+dropbox help [COMMAND]
+
+With no arguments, print a list of commands and a short description of each. With a command, print descriptive help on how to use the command.
+"""
+    if not argv:
+        return usage(argv)
+    for command in commands:
+        if command == argv[0]:
+            console_print(commands[command].__doc__.split('\n', 1)[1].decode('ascii'))
+            return
+    for alias in aliases:
+        if alias == argv[0]:
+            console_print(aliases[alias].__doc__.split('\n', 1)[1].decode('ascii'))
+            return
+    console_print(u"unknown command '%s'" % argv[0], f=sys.stderr)
+
+def usage(argv):
+    console_print(u"Dropbox command-line interface\n")
+    console_print(u"commands:\n")
+    console_print(u"Note: use dropbox help <command> to view usage for a specific command.\n")
+    console_print(u"Put --format=json or --format=ndjson before the command to get status, filestatus, exclude, puburl, link and running results as JSON records.\n")
+    console_print(u"Put --profile before the command to print where its time went to stderr. Set DROPBOX_STATS_FILE to append the same timings to that file as one JSON line per run.\n")
+    out = []
+    for command in commands:
+        out.append((command, commands[command].__doc__.splitlines()[0]))
+    spacing = max(len(o[0])+3 for o in out)
+    for o in out:
+        console_print(" %-*s%s" % (spacing, o[0], o[1]))
+    console_print()
+
+def run_command(name, args):
+    if name in commands:
+        return commands[name](args)
+    elif name in aliases:
+        return aliases[name](args)
+
+def find_command(argv):
+    for i in range(len(argv)):
+        if argv[i] in commands or argv[i] in aliases:
+            return i
+
+def dispatch(argv, i):
+    """Runs the command at argv[i] with the global options before it."""
+    global output, timings
+
+    output = None
+    profile = False
+    if i > 0:
+        globaloptionparser = optparse.OptionParser(usage="%prog [--format=text|json|ndjson] [--profile] COMMAND ...")
+        globaloptionparser.add_option("--format", type="choice", dest="format", default="text",
+                                      choices=["text", "json", "ndjson"])
+        globaloptionparser.add_option("--profile", action="store_true", dest="profile")
+        (options, ignored) = globaloptionparser.parse_args(argv[0:i])
+        if options.format != "text":
+            output = RecordWriter(options.format)
+        profile = options.profile
+
+    stats_file = os.environ.get("DROPBOX_STATS_FILE")
+    timings = Timings() if profile or stats_file else None
+    result = None
+    try:
+        with timed(u"run " + argv[i].decode(enc, "replace")):
+            result = run_command(argv[i], argv[i+1:])
+        return result
+    except SystemExit, e:
+        result = e.code
+        raise
+    finally:
+        if output is not None:
+            output.close()
+            output = None
+        with timed(u"output"):
+            flush_consoles()
+        if timings is not None:
+            # so the report itself isn't counted as output
+            collected, timings = timings, None
+            if profile:
+                collected.report(sys.stderr)
+            if stats_file:
+                try:
+                    collected.append_to(stats_file, argv, result)
+                except (IOError, OSError), e:
+                    console_print(u"Couldn't write to %s: %s" % (stats_file.decode(enc, "replace"), e),
+                                  f=sys.stderr)
+
+def main(argv):
+    global commands
+
+    # now we need to find out if one of the commands are in the
+    # argv list, and if so split the list at the point to
+    # separate the argv list at that point
+    cut = find_command(argv[1:])
+
+    if cut == None:
+        usage(argv)
+        console_flush()
+        os._exit(0)
+        return
+
+    # now dispatch and run
+    result = dispatch(argv[1:], cut)
+
+    # flush, in case output is rerouted to a file.
+    console_flush()
+
+    # done
+    return result